@@ -0,0 +1,267 @@
+"""
+Copyright (c) 2025 Li Beile 李倍乐
+                   email: 1617973918@qq.com
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+import main
+
+# 场景描述，骑楼测量项以其中的骑楼位置为起点
+SCENE = main.Scene(main.SCENE_FILE)
+# 骑楼绘制的(列数, 层数)网格
+QILOU_GRID = [(3, 2), (5, 4), (10, 5), (20, 10)]
+# 以最大网格测量的简化细节层次
+QILOU_LODS = [main.Qilou.LOD_SIMPLE, main.Qilou.LOD_BLOCK]
+# 需要测量的文字段落：(名称, 文本, TextDisplayer.write的参数)
+TEXT_CASES = [
+    ("QILOU_DESC", main.Constants.QILOU_DESC, {"max_len": 500, "line_height": 40, "font": ("SimHei", 11, "normal")}),
+    ("LIONDANCE_DESC", main.Constants.LIONDANCE_DESC,
+     {"max_len": 500, "line_height": 35, "font": ("SimHei", 11, "normal")}),
+    ("CANTONESE_EXAMPLE", main.Constants.CANTONESE_EXAMPLE, {"font": ("LiSu", 25, "italic"), "pencolor": "orange"}),
+    ("CANTONESE_DESC", main.Constants.CANTONESE_DESC, {"max_len": 600, "font": ("SimHei", 11, "normal")}),
+]
+# 场景编译结果的缓存目录，测量项scene-cached读取其中的缓存
+SCENE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "lingnan_culture_benchmark")
+# 默认基准文件
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+
+def _reset_caches() -> None:
+    """
+    清空各级缓存，使每次测量都从冷启动开始
+    """
+    main.Qilou._templates.clear()
+    main.Qilou._parts.clear()
+    main.ellipse_arc.cache_clear()
+    main._unit_arc.cache_clear()
+    main.parse_gif.cache_clear()
+    main.FontMetrics._shared.clear()
+    main.TextLayout._shared.clear()
+    main.ImageCache._shared.clear()
+    main.DebugGrid._cache.clear()
+
+
+class _Target:
+    def __init__(self, kind: str) -> None:
+        """
+        初始化测量用的渲染目标
+        :param kind: "recording"为无头记录后端，"canvas"为Tk画布后端（需要图形界面或虚拟X服务器）
+        """
+        self.kind = kind
+        self.canvas = None
+        if kind == "canvas":
+            import tkinter
+            root = tkinter.Tk()
+            root.withdraw()
+            self.canvas = tkinter.Canvas(root, width=1600, height=1000)
+
+    def renderer(self) -> main.Renderer:
+        """
+        创建一个空的渲染后端
+        :return: 渲染后端
+        """
+        if self.canvas is None:
+            return main.RecordingRenderer()
+        self.canvas.delete("all")
+        return main.CanvasRenderer(self.canvas)
+
+    def clear(self, renderer: main.Renderer) -> None:
+        """
+        删除渲染后端已输出的图元，保留后端本身及以其为键的字体度量和排版缓存
+        :param renderer: 渲染后端
+        """
+        if isinstance(renderer, main.RecordingRenderer):
+            renderer.delete([item for item, _ in renderer.items()])
+        else:
+            self.canvas.delete("all")
+
+    def count(self, renderer: main.Renderer) -> int:
+        """
+        统计渲染后端输出的图元数量
+        :param renderer: 渲染后端
+        :return: 图元数量
+        """
+        if isinstance(renderer, main.RecordingRenderer):
+            return len(renderer.primitives)
+        return len(self.canvas.find_all())
+
+
+def _qilou_case(column: int, floor: int, lod: int = 0) -> Callable[[main.Renderer], None]:
+    def run(renderer: main.Renderer) -> None:
+        pen = main.GeometryPen(renderer, SCENE.origin)
+        pen.penup()
+        main.Qilou(pen).draw(column, floor, lod=lod)
+        pen.finish()
+    return run
+
+
+def _text_case(text: str, kwargs: dict) -> Callable[[main.Renderer], None]:
+    def run(renderer: main.Renderer) -> None:
+        pen = main.GeometryPen(renderer, (-800, 400))
+        pen.penup()
+        main.TextDisplayer(pen, renderer).write(text, **kwargs)
+        pen.finish()
+    return run
+
+
+def _image_case(renderer: main.Renderer) -> None:
+    main.ImageDisplayer(renderer).show_img(200, 230, main.ASSETS.get("liondance"))
+
+
+def _scene_case(renderer: main.Renderer) -> None:
+    pen = main.GeometryPen(renderer)
+    main.draw_scene(pen, renderer, scene=SCENE)
+    pen.finish()
+
+
+def _scene_cached_case(renderer: main.Renderer) -> None:
+    SCENE.draw(renderer, cache_dir=SCENE_CACHE_DIR)
+
+
+def cases(kind: str = "recording") -> List[Tuple[str, Callable[[main.Renderer], None]]]:
+    """
+    全部测量项
+    :param kind: 渲染目标类型，show_img只在画布后端上测量，记录后端只追加图元，不解码图片
+    :return: (名称, 绘制函数)列表
+    """
+    result = [(f"qilou-{column}x{floor}", _qilou_case(column, floor)) for column, floor in QILOU_GRID]
+    column, floor = QILOU_GRID[-1]
+    result += [(f"qilou-{column}x{floor}-lod{lod}", _qilou_case(column, floor, lod)) for lod in QILOU_LODS]
+    result += [(f"text-{name}", _text_case(text, kwargs)) for name, text, kwargs in TEXT_CASES]
+    if kind == "canvas":
+        result.append(("show_img", _image_case))
+    result += [("scene", _scene_case), ("scene-cached", _scene_cached_case)]
+    return result
+
+
+def run(target: _Target, repeat: int = 10, warm: bool = False,
+        only: Optional[List[str]] = None) -> Dict[str, dict]:
+    """
+    运行全部测量项
+    :param target: 渲染目标
+    :param repeat: 每项重复次数
+    :param warm: 是否保留缓存，默认每次测量前清空缓存
+    :param only: 只运行名称以这些前缀开头的测量项
+    :return: 以名称为键的结果，时间单位为秒
+    """
+    results = {}
+    for name, case in cases(target.kind):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        times = []
+        count = 0
+        # 热启动时每项只创建一个后端：FontMetrics和TextLayout按后端共享，新建后端相当于清空它们
+        renderer = target.renderer() if warm else None
+        for _ in range(repeat):
+            if warm:
+                target.clear(renderer)
+            else:
+                _reset_caches()
+                renderer = target.renderer()
+            start = perf_counter()
+            case(renderer)
+            renderer.update()
+            times.append(perf_counter() - start)
+            count = target.count(renderer)
+        results[name] = {"min": min(times), "median": statistics.median(times), "primitives": count}
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float,
+            min_delta: float = 0.001) -> List[str]:
+    """
+    与基准比较，最短用时超过基准的(1 + tolerance)倍且增量超过min_delta即视为退化
+    :param results: 本次结果
+    :param baseline: 基准结果
+    :param tolerance: 允许的相对增幅
+    :param min_delta: 忽略的绝对增量，单位为秒，避免微秒级测量项的抖动
+    :return: 退化说明列表
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        best, reference = result["min"], baseline[name]["min"]
+        if best > reference * (1 + tolerance) and best - reference > min_delta:
+            regressions.append(f"{name}: {best * 1000:.2f}ms > {reference * 1000:.2f}ms × {1 + tolerance:g}")
+    return regressions
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="岭南印记渲染性能基准")
+    parser.add_argument("--renderer", choices=["recording", "canvas"], default="recording",
+                        help="渲染后端，canvas需要图形界面或虚拟X服务器")
+    parser.add_argument("--repeat", type=int, default=10, help="每项重复次数")
+    parser.add_argument("--warm", action="store_true", help="保留缓存，测量热启动")
+    parser.add_argument("--only", nargs="*", help="只运行名称以这些前缀开头的测量项")
+    parser.add_argument("--output", help="结果JSON文件，默认输出到标准输出")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基准JSON文件")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的相对增幅")
+    parser.add_argument("--min-delta", type=float, default=0.001, help="忽略的绝对增量，单位为秒")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基准")
+    parser.add_argument("--trace", help="启用埋点并导出Chrome trace文件，此时的耗时包含埋点开销")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        main.PROFILER.enable()
+    results = run(_Target(args.renderer), args.repeat, args.warm, args.only)
+    if args.trace:
+        main.PROFILER.export(args.trace)
+        main.PROFILER.disable()
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "renderer": args.renderer,
+            "repeat": args.repeat,
+            "warm": args.warm,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(text)
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["meta"]["renderer"] != args.renderer or baseline["meta"]["warm"] != args.warm:
+        print("基准的渲染后端或缓存设置与本次不同，跳过比较", file=sys.stderr)
+        return 0
+    regressions = compare(results, baseline["results"], args.tolerance, args.min_delta)
+    for line in regressions:
+        print(f"性能退化 {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -6,7 +6,7 @@ a = Analysis(
     ['../main.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('../assets', 'assets')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -15,15 +15,33 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import argparse
 import base64
+import bisect
+import functools
 import ctypes
+import hashlib
+import json
 import math
-import tempfile
+import mmap
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import tkinter
+import tkinter.font
 import turtle
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from time import perf_counter
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from tkinter import messagebox as mb
-from typing import Tuple, Optional, Union, Literal
+from xml.sax.saxutils import escape
+from typing import Tuple, Optional, Union, Literal, List, Iterable, Callable
 
 from _tkinter import TclError
 
@@ -42,18 +60,96 @@ def _get_windows_scaling() -> float:
         return max(1.0, scale_factor)
 
 
-def _draw_coordinate_system(pen: turtle.Turtle, screen: turtle.Screen(), axis_length: Union[int, float] = 300,
-                            tick_interval: Union[int, float] = 50, label_offset: Union[int, float] = 20):
+def _maximize(root: tkinter.Tk) -> None:
+    """
+    最大化窗口，"zoomed"状态只有Windows和macOS支持，X11下改用-zoomed属性，都不支持时铺满屏幕
+    :param root: 顶层窗口
+    """
+    try:
+        root.state("zoomed")
+    except TclError:
+        try:
+            root.attributes("-zoomed", True)
+        except TclError:
+            root.geometry(f"{root.winfo_screenwidth()}x{root.winfo_screenheight()}+0+0")
+
+
+def _capture_window(widget: tkinter.Misc) -> Optional[Tuple[int, int, bytes]]:
+    """
+    通过Win32 GDI截取控件当前显示的内容，其他平台不支持
+    :param widget: Tk控件
+    :return: (宽, 高, RGB像素)，无法截取时为None
+    """
+    if sys.platform != "win32":
+        return None
+    from ctypes import wintypes
+
+    class BitmapInfoHeader(ctypes.Structure):
+        _fields_ = [("biSize", wintypes.DWORD), ("biWidth", wintypes.LONG), ("biHeight", wintypes.LONG),
+                    ("biPlanes", wintypes.WORD), ("biBitCount", wintypes.WORD), ("biCompression", wintypes.DWORD),
+                    ("biSizeImage", wintypes.DWORD), ("biXPelsPerMeter", wintypes.LONG),
+                    ("biYPelsPerMeter", wintypes.LONG), ("biClrUsed", wintypes.DWORD),
+                    ("biClrImportant", wintypes.DWORD)]
+
+    user32, gdi32 = ctypes.windll.user32, ctypes.windll.gdi32
+    for func in (user32.GetDC, gdi32.CreateCompatibleDC, gdi32.CreateCompatibleBitmap, gdi32.SelectObject):
+        func.restype = ctypes.c_void_p
+    user32.GetDC.argtypes = [wintypes.HWND]
+    user32.ReleaseDC.argtypes = [wintypes.HWND, ctypes.c_void_p]
+    user32.PrintWindow.argtypes = [wintypes.HWND, ctypes.c_void_p, wintypes.UINT]
+    gdi32.CreateCompatibleDC.argtypes = [ctypes.c_void_p]
+    gdi32.CreateCompatibleBitmap.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+    gdi32.SelectObject.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    gdi32.BitBlt.argtypes = [ctypes.c_void_p] + [ctypes.c_int] * 4 + [ctypes.c_void_p] + [ctypes.c_int] * 2 + \
+                            [wintypes.DWORD]
+    gdi32.GetDIBits.argtypes = [ctypes.c_void_p, ctypes.c_void_p, wintypes.UINT, wintypes.UINT, ctypes.c_void_p,
+                                ctypes.c_void_p, wintypes.UINT]
+    gdi32.DeleteObject.argtypes = [ctypes.c_void_p]
+    gdi32.DeleteDC.argtypes = [ctypes.c_void_p]
+
+    hwnd = widget.winfo_id()
+    width, height = widget.winfo_width(), widget.winfo_height()
+    hdc = user32.GetDC(hwnd)
+    if not hdc:
+        return None
+    memdc = gdi32.CreateCompatibleDC(hdc)
+    bitmap = gdi32.CreateCompatibleBitmap(hdc, width, height)
+    old = gdi32.SelectObject(memdc, bitmap)
+    try:
+        # PW_CLIENTONLY | PW_RENDERFULLCONTENT，窗口被遮挡时也能取得完整内容；失败时退回到屏幕拷贝
+        if not user32.PrintWindow(hwnd, memdc, 3) and not gdi32.BitBlt(memdc, 0, 0, width, height, hdc, 0, 0,
+                                                                       0x00CC0020):
+            return None
+        # 高度取负值得到自上而下的32位BGRA像素
+        header = BitmapInfoHeader(ctypes.sizeof(BitmapInfoHeader), width, -height, 1, 32, 0, 0, 0, 0, 0, 0)
+        buffer = ctypes.create_string_buffer(width * height * 4)
+        if gdi32.GetDIBits(memdc, bitmap, 0, height, buffer, ctypes.byref(header), 0) != height:
+            return None
+    finally:
+        gdi32.SelectObject(memdc, old)
+        gdi32.DeleteObject(bitmap)
+        gdi32.DeleteDC(memdc)
+        user32.ReleaseDC(hwnd, hdc)
+    bgra = buffer.raw
+    rgb = bytearray(width * height * 3)
+    rgb[0::3], rgb[1::3], rgb[2::3] = bgra[2::4], bgra[1::4], bgra[0::4]
+    return width, height, bytes(rgb)
+
+
+def _draw_coordinate_system(pen: Union[turtle.Turtle, "GeometryPen"], screen: Optional[turtle.TurtleScreen],
+                            axis_length: Union[int, float] = 300, tick_interval: Union[int, float] = 50,
+                            label_offset: Union[int, float] = 20):
     """
     绘制平面直角坐标系
-    :param pen: Turtle画笔对象
-    :param screen: Turtle屏幕对象
+    :param pen: 画笔对象，Turtle画笔或几何画笔
+    :param screen: Turtle屏幕对象，为None时不控制屏幕刷新
     :param axis_length: 坐标轴长
     :param tick_interval: 刻度间隔
     :param label_offset: 标签偏移量
     """
-    tracer = screen.tracer()
-    screen.tracer(0)
+    if screen is not None:
+        tracer = screen.tracer()
+        screen.tracer(0)
     pen.pencolor("gray")
 
     pen.penup()
@@ -116,14 +212,15 @@ def _draw_coordinate_system(pen: turtle.Turtle, screen: turtle.Screen(), axis_le
     pen.write("y", font=("Times New Roman", 10, "italic"))
 
     pen.home()
-    screen.tracer(tracer)
-    screen.update()
+    if screen is not None:
+        screen.tracer(tracer)
+        screen.update()
 
 
 @dataclass(frozen=True)
 class Constants:
     """
-    常量类，含若干界面语言以及内嵌的Base 64编码图片
+    常量类，含若干界面语言
     """
     QILOU_DESC = ("骑楼是一种商住建筑，外廊式建筑结构，流行于华南、南洋等地。"
                   "它底层沿街面后退留出公共人行空间，能遮风挡雨、防晒避暑。"
@@ -136,465 +233,1916 @@ class Constants:
     CANTONESE_DESC = ("粤语是发源于岭南地区的汉语方言，保留了大量古汉语词汇和音韵特征，与普通话在发音、词汇、语法上均有显著差异。"
                       "它不仅是粤港澳及海外华人的日常交流语言，更承载着岭南文化的独特韵味，在戏曲、歌词、民间文学中广泛使用。"
                       "从“食饭”“睇戏”等日常表达到“人生不如意事十常八九”的哲理俗语，粤语以鲜活的表达记录着生活与传承。")
-    LIONDANCE_BASE64 = ("R0lGODlhXgFeAYcAAAAAAAICAgMDBPPz8wQEBAQDAwcHBwQEBgYGBfPz9PPz8fPz9QUFBgkJCQMEAvPy7gwMCwsLC/Pz8g"
-                        "gIB/Pz7w4ODQ0NDQUFBPP08QoKCfLy8wUFA3Bwb1RVU1hYV/Ly8QoKDPPy7wcHCAQEBxMTE0A/P/Lx7VtbWREREQUFCAgI"
-                        "ClZWVGRkYxcXFxUUFfLy8GJiYmBgXxISEAsLCg8PDwkJCBAQDgcHBvLy9O/v7VlZWGNjYVdXVR0dG2xsaw0MD2ZmZlxcWy"
-                        "UlJB8fHfDw8jAwLllZVmhoZxISEV9fXiYmJRYWFUVFRF1dXSMiIwwLDfDw7hAQD19fXR4eHDU1NRoaGSAgH2JhYBQTEiQk"
-                        "IvDw8GdnZScnJ4SEg3R0c0dGRQYGBHx9exUVE2VlZBQUEkpKSiIiIVNTUUNCQzIyMFFRT2BgYUtLSlpaWz4+PRkZGisqKk"
-                        "5NTVFQUIKCgBkYGEJCQV5eXT09O+zs6oCAfyoqKExMS3JycDs7OSgoKVxcWhgZFx8eH4mIhxUVFm5ubTo6OmFhXiwsKykp"
-                        "KElJSBsaG/Lx8BISEmVlY0FBQGRkYnh4dzY2NFVUVW1tbTY2N+rr6h0dHVNTUjc3Ng0NDCQkJTw8PHt7eSEhIS4uLe/v8C"
-                        "goJk9OTxwcGldWV/Py92tqaYGBfiAgIDk5OYaGhUREQjg4N0lJR+fn52lpaCwrLDMyM05OTS4tLyUlJhQUFBAPEUhHRlBP"
-                        "TgcHBWhnaBwcHZWUlD49PwcGCYyLjDExMn5+fYuLiUVFQ15eW+7u7w4OEXV1dDQ0Mujo6mxrbVRTU+3t7IODgo2NjN/f3l"
-                        "hXWYGBgo+PjXJychcXGHd3dXp5eXZ2doaGg9zc2318fhERFJOTkjAvMI6NjllYWqOjocfHx9ra2c/Qz1NSVsPDwpiYlmlp"
-                        "alJSU+Pj4oiHhqysquLh4Z+fnra2tL++venp55GRkK+vrZqambm5uc3NzJ2dnebm46ioptTV04aFiZycm9LS0qSkpuzr77"
-                        "GxsLy8vCH/C05FVFNDQVBFMi4wAwEAAAAh+QQFAgAAACwAAAAAXgFeAQAI/wABCBxIsKDBgwgTKlzIsKHDhxAjSpxIsaLF"
-                        "ixgzatzIsaPHjyBDihxJsqTJkyhTqlzJsqXLlzBjypxJs6bNmzhz6tzJs6fPn0CDCh1KtKjRo0iTKl3KtKnTp1CjSp1Kta"
-                        "rVq1izat3KtavXr2DDih1LtqzZs2jTql3Ltq3bt3Djyp1Lt67du3jz6t3Lt6/fv4ADCx5MuLDhw4gTK17MuLHjx5AjS55M"
-                        "ubLly5gza1bsy1WTGJtDhxwkIIBp0xGaiF6dkcDp16aZsJ490QDs27RzP3R9+/QBGLqDK1TT+3Qt4cgR8iBQ2ncDKsmjA2"
-                        "BRMIkdKrMonTHYSHruFLAc5v+ZAsa7XDAE/IxTeSgAgQoMC52Ok3KOIwgIXJgXWiDAiCe8AIESLqYV0IMpCRXCwGlinBSM"
-                        "BzT0FwAE+wGVSm8CYGFLGSPxdloBZHCBRiKOzNIAbAT0IJIhO4BiwQW3GVDhT0kUd5oADVhxBUhc3NZcAD+a5kAJHxliRQ"
-                        "MH2HjajD4Jo2RvNHjQURhRvJbkbSB00BE0x3j45GnVMMlTGl8WZ8MWHQ3TQwMqIBCAARGQcUc2Bk1SESFvLKhkkK+pJqZO"
-                        "ssBmCRkTBHClkjNQJ1EaCMhSkQsqTMTBDGX6h0Uft0n5Z07yvaYoAOOA8Bqfp80QJkQSEoAmREaYlsI5ESH/QSpsAmQAyC"
-                        "MCfQPbAUdsmpMOsCVhkCdlEhCGQ2jANsEtDK0hhocCiPDQLV8eoIgXBQlCq6857eFbADogdIeXxTnSUBcS3kaDEJHccgIb"
-                        "RbhAgAO9xeIQFl+KghAQsDnALU5bwLZHQlRA8CQBwDRUQrqV9muFQ6x82UJCZcBWwL84TfELGyfoUMpCHpB72xoNNXMHLr"
-                        "M+CYE5DeXxZQPUKMSMIU3EsYkTTmCsFA1PMuuQDhmM8CUBILyRi0OQiPwaAZro3JUST4ZykCkrIHRLH4yooIJtDKhQSxHP"
-                        "IJQNJgelAqON8DntVbIpByCFQVlsMIVGFRNwkAhKTqx2UjzE/3GIE53okQiLDUV8GwJInHAQLgsScEYeFfnQQAGuAVdQE0"
-                        "vQe5uKDe2xwi+Ap9EBD8HsDZMrtDB8eA87KHSHaQcwMIEyCVHjwI8C0PA2RGyc+JqWCAXhhADN6Y1QDFTU4OahKL5i+kqq"
-                        "qG7lqKYhYedBWdxAgOIMvdFbA6+wcD1BXbAQicG3WeAQLxMi1AUiSivJxfMnkdBwb29gNEkEBUgfQC8b2MDZbJQB2l2kFM"
-                        "W4H2wiQD+SZECBvUmBIjDiCipMoG3FKQAjxoCRL9hAcxA0DY4aGBJmhPA2SYJDRoZBAubZqAAiiEAREnaRUYAAgw2zFwk9"
-                        "coMTFocAktBIF/9ioAcbTMAAbroACJBgBR0cSyM3wOH9LrZDjozChze6Tc5+Ugcs+sg0E6yiRnznxd5MwCdkiF8ZHSVGjK"
-                        "ixjAzQxU6eUEYlIaCNF9lBHZ/EwJsIQk97LA4eLdLFQNrojDYBoSFvY7lBSgRqi/yhRSyYLhUMgXsTGYIiI/maLzhyImbg"
-                        "ZHHSFpEeHIBPzcnAqiCCijcuUhiflIgeRCnIiOiBeEqKgkR6QcveAC+WDzlHL3sDEQuUSQAGeogMhkmrXQATIrlgJmwG4R"
-                        "BjvsYAP/BDIRARARGexgwNYYI0X9OLZ0ZknL9jCCWWRohl5OABChhAAshhA9j8EiHXkOIii2H/ToiQEZ0M+ZEIxKGFBAxg"
-                        "AQsYgEK1gIrXREohKkCnaUQwsH46xBASNY0MEIQQUJwGDOAYgAQGQAF5KnQAH4CCLl7zh4SIM6OHsChE3qiIH9jGkDVAyA"
-                        "lew4oFGJQCGDhpUBNAAWe8hpQGWSQDMoAEJdlNpg9pQ3EOYECBdCEO/8RiMg7igg+FQwKkSIACfDoADJTUpxKop2kYgBA/"
-                        "7LEFbSAIMAAJGz9AFSI8u00ksLfHPhakAJoTgQaESlIK+JQChl3EFZd0kD0KAJMD8UBvcHHXiPDpCQe56R6tkdTTNCAECk"
-                        "0AQst6UNI+wBivKYdBVmHIIRikEymw0ior2xD7/71GhwNJRY8MSZ+CeKgCJRUtKRKqUOIO4AFekJAA5GEQtQaypQSZRAJP"
-                        "41faOoRSpqEQQUzhPy/K6K+nMQAFEhBU45JWoRQopGkO0l0sesMgEvqudSECIwdcoyBDO+F9CVKL5ggAGxpALAYwkADyYk"
-                        "ABIXgBEf5pkC+EsL2naaRAigCk+UrETfohSA9ttIlUtAIbeb3fMQqyAjfFxqAKJXBZJSABBZjAHa9BQkGk0E0FWuEd+1iB"
-                        "Gp9KkPVa+CEcMA0nCGI4Q1mpE854wQtEuo4aN+yOBSHWafzxggSQArEjPa4CkIE+IB2NIKJQYArcAYXSLuMWKVtCQTwK2R"
-                        "8rpP+pPBaIjUqhhZHCMwEvcIYrcWOQAV6gHR/AQTwHS4oX2KMFrwEBfBXIDzw/QJ4UeAE5sHubXvU4zm5OSGwIsoniQIMC"
-                        "LR5wPAtMDwUawSBqCFIfxFGJD+TgE5UIg4lhx9Ee348DGhDtBx6QgAeY4AP4mLU31UeQbkIj0wqRwoRKNxC6zucTJigwrx"
-                        "WghQ9oIQfAuB/ZDCIGM0ZAs69JhEFWcL8s4KEfrSCGBuL5gEcrYB6I5vNA1rlXZBdEBgJRRAB6K5Ag06oCRFjEoxehYE7Y"
-                        "1gKxEFqlaIAQOkyvODeow0EcXKkRUMMFDCgAAhTxjU+INQQUMAE+euPJgUj1oUj/CIS9j5EJgTzhAjsayBp644gPSODRWl"
-                        "iHPLrsHn2apgEICcaGlbSBexLkFQ0TQKFeIwZy7JqkIcgBz03j2h4LQCCBMkamHVEA5wHAxwPpQW+wQW2FOgMCG8CifA/S"
-                        "h/Y+LCGM8CIC1BFPHCRAAheCzQUKUpohl0EAmKZtNgTggHBxgAFsJcjSXyODB4RAA0SAgsN9WJq1I8QOfqCFClJggCYyhN"
-                        "I+v00B7PGBwQ7gHdIriG245/C9z5cDBvMXAHZqeenFIagD0EA8BgjBCIwjFSLZxREisecf3kILJ82BNV9TkAoEQAgCkWoA"
-                        "eDFfJwvEozm1NWzgYQKFagATISTA/xRahxInhTADSx6AAnLAjdvwgSCnCEAGBCJZsFc2vgKJu6K1/5p2LEOhn0Bp9xNTA+"
-                        "EKcDAEd4AtGiEJfqAHUgA5AtEqEGQAWkAE7bYMiXAbfiIQnRAArvd1piEslRUEEkJZAGAblodC7YB81jZ1ZYJUixcABaAv"
-                        "F1ECzFMAljAQmKJABtAPJ2UCjnAbWzUQUwB2p5E/lbVSpvEDAgEjKYBft9ENWqAAD/ABUnY//PcatHAqE3EH/uNXENYbmV"
-                        "BmCrUMTiBvAlELRjhRtFUDp8GEJxgAUDYQ0mMLn/ACj1YPQ4MCp0FskOCGxSEtFKEkqiAQrCVCbvVwfdJ96lcJWf8VAKq3"
-                        "hvYnU7z0cwLhJrI3EM7lWRrwAQqgASHQbTYyA64QDxLCCgLRVS8kIBJRMTYCZWNwGgjgDEKgJBGADItggQ8wcrCRggGQic"
-                        "xXWbHFhgCwdNtAEHDAJwSADESwZBTgbz5SAB2ADciQdgFgaeDWGzHnBy3wfggxBFlAfprwJAMhQjJQCd9gjb1BCUQgARZo"
-                        "AuxwGyQAhXMYjHcFiAGQfXEXABJ2BL3BAp8ABUT1Aj5AAiJzBjkwAFrgBqZxPepYHKtiG1WDEKbxZdpAjnJmGv6QAFoQDU"
-                        "qTBkSQUD6VA1UCG0FAENCAGuVoGg91V6roY25AL1VQEBegjOggAab/FwJ4IAgugAsEkAHcIA4mMJRQkG0BwEFxqCQTSS8T"
-                        "eRBgcACgAQCWgJEguAE3+QED0AqXgB8q8ARZ0A4mEE8DgAPEEA23gWmqYBpYIBDkZhqWZ1HEwVgvJQByQBAUBxuAIJAlJQ"
-                        "EUgAOfgAeV8Aka8GsSAAX3cDaWNktKspIniRBpBzzRZCPTIBBhQF2VgHyLgAMfgAfEkANKFlRE8AEvUAjSQ4ADcVPmAgB/"
-                        "cBoyRls/siqlUhD4+BpCAAVEQF4KIAF2pwAGlZnvoIfNMQsDAQc/lAYCUSP8mBD9YVcC8UDfchoK6IqmkQnOsABLJloSkA"
-                        "CeSF4v8AnUcpadFQA+/yAQkxcATXlX8RYA4gYAHgKBArEDs4IF+zAAIbAI62cCI6UFy0AOs+keBIECpDKeAlGSUdlYb3IJ"
-                        "AyFs8zEQTfUaBbALGvACvJmdvZYAJoAOgVAcalAQWSBCAnEJeBMAQDdfxBkAaUMFzZFhA+FRxVEE7tAKOaAFJpADy/APwz"
-                        "Mq81gQ3jCMDjA3A9EFp1Gg4RlnsrB0BrAEzVAQ8Rck07ALyJADUBCly0APtmAjb6d9cgQAZ2gaHPBjU0lFAJAuXUoQYqck"
-                        "DYAFJLB8sAF9EAFInxKeAUALEFECLih/ZNADNpCNsIECBqFvpkEIGYkAPJBpz1AApwYAS3AlYDoQXP/wRi4EJALAALjlEJ"
-                        "nwGqxooKcBHRDRA6F3I51gELEIJIhUChAwA5BgbwCAlD7wI2FUEOlZJgdQC1xoiFhwqVzlKZr2GqOgELcwkwUhCcX3GlJT"
-                        "EGkASHYgEAqIqr5ljwXhZE8CBnAgoANxBgEgA8l6EBl6Gm9aEMxjqwZxBhtQBAaRCHt2JeJqEF6irArhAUOXeAbhBYrQNh"
-                        "OABmxnGozAXAORBIPApgAAfqfhrVlIMgCwBT+wqwShbAVABwfBAxlwAAoHGyNQDN1xEM5pGhKnrgkxB6OiEEdwC0LQA4HA"
-                        "BY6AoLkqgzLQAj/wGjYwEHqkrSULdvXnGgYgA6cQogH/gCsIwQJMEAlT0AOvcAa7gxBqun8YmxDqZRrvhRGv85wOxbK4Sp"
-                        "G+MRBS9qimQWwXAQzME3jqmgvG1JIAkIinkYMXAQhfwn/kh6kB4K6b2BtzWBHtNypPBABoUAMVEFfIFgZkRLQCgQgWYwEs"
-                        "QxFFSJXseRqG8LKT2YRPsnaCEBHKMIx9aLcCEQqvAQhuBgvgprcCcYWvgQCeMFsHoQMQ0ACyIRB28CQCsIFuQLdbhBCAUA"
-                        "wWEAHeGKZPQrkD8QMIsArSihCsUAUi46N2iSKNWVmCIAAPaxqYZRCXMFUBMAFkYAWzcAiagAUGkC4CwE8r+UMRoHUYIQNv"
-                        "NKYZKYtR/0AGZgAHQkAo3VUAbHAQDXUbFXVXDxleBJGaArEEWEQQ8Dk9ETCoHcEHZ8gnSkAQLOBDDDcQapAOAzEExSGwMn"
-                        "WXsFEe+co5zelDNCQQtmUaIzAIudsRhTAIIHQDXfC71PMlDjADMSMQrIBUongbcipTzZAymSgQP0kQc9ABvKckBYALLbBt"
-                        "MlwCsABdCxEEQSAHq5AGRXAIh1AIt2AIqhANDfEFRRC0A7ELncAclVIAKFC4A/EGBkAGBPGIpwHFz+R8NoKUAsEGptEHBi"
-                        "EHT3AoV7IBBlALsFCXE2EEj8AFZPSofFIAFUAFQgoRxtAHNkAANXwBCIAFqoDFBIwAAv+QpdfbG1r7SU/yCwVRqaZhCwkR"
-                        "Db7gCxYRDKpQp+EnC5ZGEfqQDseoU7whiAPBL0oCsI5EBU9STgVhAT9CAI5wqhuBBgpqSFyQtBohB9lqGiZIECVpIytrTr"
-                        "l8G4BaEJFgRpbgBkYwBjDwCGjgB1hwqAvRAc46TC3gwwnBAbowBHDgBqPwCE1QB2bwBKpTAJ8Kp8XhrsBUJirAysTHAA5b"
-                        "GoQnQhdQBdacEDGwtug0AZbMEMMQASngAAcQW7gjAvxaENPwJQKgWs90TFeXED6gA6/QA05QBB2wrQmSUTayBGCMENZwBZ"
-                        "RgBYGgBJ4QA8CHEK6gT67wTJDQMHy6EaX/oKYebSP/yxGbZCMb+EmqXCk5ahG5wAjBetOooSkX8b5KUlWfhFH3wyEVkQTZ"
-                        "bNTFUogVkQ1gWyZI/UmcAEENEhE+8KpUHUIQEEQRQSYKxMp4dD+HsgQTqxBBsI9jvUcGEAjSwBAlCkFG50hh+CQNEAWwEA"
-                        "c8YAueQNRzPUwGYAFKwAQ8wAN7AAcoUNTEZE4Ve9iWfT98QrUN008lcNmefdO0a06fPdro5Lmx5MUhpNmkPdqL+kwBs9oK"
-                        "pNqwfRqFAFWz/UIZkAGZgAI08AO1UAHDfNsOmswWNQSdeticwIgnhQOLUAnCfRuMIIzP/RrAMACkcFKGNQB4MN0fQluv/8"
-                        "3dc/AAC0BgCYUBErAM3G0abmBdXHDcVC0IVYYBC0AKEnBg283d+DZfPsDdgqB+8j3eZSjbnt221lW6z30N7fZoJyUBlSDg"
-                        "lg3LbrYDBeDgY50PVIhi2amTwk0Ax4tsXRBR0oQAefANWLDTNtINYsViwaUAzt0wFzAG6kAD7h1++2xvfDhMsfB/62cPZ6"
-                        "CnvYHi4k1U6jcA6F0sO4AHL0ABeJAPk9NLSKWsczB0kdQActAKVmadL4AMfDDVt+ELGvAAOLAAdvYClYBDAgACeZADJvDl"
-                        "IfABwIAIxWtIIkDGRXsOkm26P1kKlUCfYylSCjBq4NAHFetCJAALiaAMSf+wA8MgCWjAtzZCAl7wDgveazfna9ggDATQ1x"
-                        "J9A6NbtAUxB3TgbBCEAEewDi/AYgvQbvQZTzdn3QPwCeBgBDKAJKcR5xZcHAjADb7gDBqwCCYABal+Z3eHXlsGD4HbGxTu"
-                        "gSXn6QnRBjxzKJ16Dwcl5KFFUiawAFowCfyQkIh1UJXwD9WwCSRwIiNAL0nSHxcAAVVgC41wD60ABZA3o+GABoJAAX+uUK"
-                        "AlT6KVANhAv8WRMsRLAKIrYcy+ENXAA4pgADYLJAVgAHRgBnIASa9xC+SAYuon3o5HBOxQABbwAmGFlQVWYBgABTmQA3hw"
-                        "8siABzmwCHypmci3bkSgfgn/cAKCTA4x/wBZZu8Exg41LACOUAKAYACucSUGYAA0QAJuMAwFLxIdQC4FAAMvgJVUuAAKAA"
-                        "Xi4Brq8AJkdVJ3hw328AmFdVLyJAEXmmsKpeAHpQU9VAAAZp+552LvsL6vAQcfvPQxIcuwYQHqQASD9QGfgA4yPgtYiXsn"
-                        "RQqkIAZggAw4oO/0aVgL0AI1EA4oZlCPRgEf0AzOxwj90GsLgAPOsAvkYgB9bPcV4Qo1PhF1ID2iAA44oAH1MAhyiA0l9d"
-                        "/wpFCtkAIFkAMhAFoPUFIKQAEP0GnlkGuP1m4iiQO6EgCysAAaUAk64CWl4asXsdeezgNAIgv5cBHecxuB/xANEiIJ63Zc"
-                        "JnVS8SCiCbmb5YVSpRAAVLAO6mdcBCZoy1QAZwCs3oQaf1sRaxAIDKBLpL8HAEEggIAWVwAcRJhQ4UIAvlAwCBBRYoaIBe"
-                        "YtGjCAgoSMGT9YC7BEywAcCwZIkGByQBcHLcCdVKkxIyk1EQkIHHgg4o0YDH0yHDbrh4AAEH4eRZpU6VKmTZ0+hRpV6lSl"
-                        "kSRKnICoCYxuUO+IuDpRXI6RCRJ0VEDkVIBVJhQkUPBAwQAMDwbEC3Cj1IsPZweE+KCF2DJ1OsMemLDCJ5Cj1NZkuRE2gA"
-                        "GqlS1fxpxZ8+anPSQTrXjhZ4Q4P88gkByAABV9rYhQGKABCv8yiBxCyFWAMi4GCfQCFLCk4IOCEIvwiPNCZ4ZE0AiUKGaY"
-                        "zMmMnzhTB1DBWft27t29a6ZxXaJohuwiNpjzk4Mu62EJWLmSyp35APo0JMAxYMGCtwsSrKsoHHB8cYSEAgwLqwHofBqiop"
-                        "/Ei4iB7yaksEILuwMDwgAkZGiOqxBBioUSQLgKNOYiqqAHODYRRg4jLomlEC60uWoE8SBAA6kVBEDwQQ0vBDJIIYc8SsMN"
-                        "F5OMEqVKsaIBI5+s0YAn9vAgqSYMCGsDHyEksksvv/TOSAR8YuO6CJJYio8rzGihBiwRhPCAAxjIpIoSFkxKByw/+6kADS"
-                        "UBM1BBB30qCSP/KWPICAgZcEMqYDzYhJISEimjhDKuSA8qObKIc0vxciQ0VFFHBaCEQ30yFEKiIrBjyEnMgHIbn4wUg1Rb"
-                        "b+2yAiPJW+gRKM/TBQYKpbDk14jSmVVDDnFlttnvcBHTpx2MtWkIPDcLgwUzcIJTQ2QZMlIAZ8cld7OBNBTBJxaolQyFYx"
-                        "rJg6oTeDhlAj/ZlejbhZ68pFx//4UqiCezYygGfBdtoIIpPNmEjQ4MiUGHDsqgRA9FZMgAgW4PlmgXn0wUrxOARyb5KBue"
-                        "/MGnDsTTg2OXn7TAAskM+2ljyZYtOeeSHXgyAp8uEe+RCV4m+jpNFL3OU/EEIERnpwFWBUok/3wiRDwAPCs6a4kSAcDqZI"
-                        "2k42mxyf2VC6XPpWwVrdcuo+ukP4ZybLlxtePXXM4eCMRU1y6aAwBUSA1RhpyAcpW5Dxf1XiN9/mmD1M4BwAMjG9S6Pa/T"
-                        "SI1xnxSH0AHEPw90GCingeaoGiT7wWO3IeQDyjeeNINyLgEoIzUzjqoDyk1A551IOqBcAyldw7r9oAsgJGB1Db14UpXcId"
-                        "QSAB9S6wMpKEFwpXftLQwjXAZYSIoKyTpASENRlOfyyR0k0bAGhDiP6FqG4L9uzO3v9w41CAugYSnJw3oEQjIkHvItR0PU"
-                        "0d/slhaAKiAkgRJZCqeMhAn8VZAzfthfLZLRFP+QBSAhYoDQGABwByPdbk8KFE8BVIEQsFxFcEnpAi06GBEThcGCN7RMLs"
-                        "RDgFdc4yknHEhC0DC7WBhpGAA4hIbCBgAghkUEVToICcJChqc0AgXiSQEOtRiVKXCOAbUoRClUB5UkSuSFQPMa+mbmBQCw"
-                        "wWYSOcFBinUdRSTkF1cBgxGkcoRVaKODKNhiIJfCAyH4IRGGkAZmCGEiEChEPBkoH4TIk4cfHWRl12kbQnhwld1dJg+xuM"
-                        "IqqnAHQZYSSICLiA0ceZ3zHUQGELIfAByXxj2IpxQJ+YNECmBKXpJsFBJpJUJccJ1GHWST4omCAMWTrkjyKSGii4gLejnN"
-                        "f0n/BBQKaVlqoAiAuoknmKe7DhYScp3kJcQcEpEDNdUJpkkoKSmAiAgFE9KI65xhnNdJAfkO0gLx8CAh9AuJQgRxnqXEcZ"
-                        "0H3cwWMjABbSyFZ5m8p2TKkZAHXiUDrEAIE8SjLwAcTzJ6dKQDQJqUGojgGQhFKVXcYJ1aKeUMAbjFQiYwQ4UMTzKASMgX"
-                        "0niQJkaEIRdYAlNmKYBTMCOlR01KMMoQgbAUoAhMEYMaFqLRsIgrIZfgmWQgepAZYkchjAgAnCawkG80oClNJMAPDIpUpI"
-                        "6jBDSw3HgM0RSM7qtELwQAJKKQmnEoBCKSgYVCiiCZbSJkjEuBgHgMwAVhsZWa/26QQVY1lAHwUSU8V+mfQtyQGpmmRgcK"
-                        "WQHnDmAZKzyJABBAgd8cK8ihQckPltlCWE6xECncbCGJPcxUJaITs1VGYL8SwmoFaSzGWMaAEUkDuMISS4QMNiyaQ4gPrF"
-                        "POykTDWDgTrgVL8Su8TiUMikvnbcMiToX89iqgUggtJGILzFS0ktm9YR+4m5nIRKRVC8mmRIqXU8IypAoQxMxxn7QF+N7Q"
-                        "veJhb2YkiKaFcCIs3lCuLn0CCtVIFTNXMFZvC4y/XzH3KEFoChYCAGKGtGeDdgUNCXxCCQIUgimnaFpS6vskXm1Ye4Ptqm"
-                        "TasJRBEMCHS6EDGxlSRAAvJDIpUP8NJHwSilgwpRgN6CRSgvHXJ53YxrzDBEAlw0OmDI0A8oOKRxvJkJOppgWVmQOWBGAB"
-                        "//2KzVfmXQEkCyFuMOUI5xJAICrDAZ28eSGYC4AjKhOLWfp0Kc+I63WsAefPyfdJ+lwKoK9yX6nYIgBT8AmGnVAZ3F6lsk"
-                        "qZQ6JRx2jEidqMkXgKRSRTADZMhRWQVsgRrjkVRHxGAJZ4yl5VFUBSj01mn9nQIL4QlTcOpLBdosZmrwKnCkDFFEMwdXd7"
-                        "XbLUHEAADaBCV6ACCU0wYgINSIGcrkKAvnopGbq+SgoMIAIZAEIJUikBOGd2y2nr7Ae6JAAIzCCFzbTBEvArgBP/lBwkD7"
-                        "RWl0hYwcAx0wFEaAMBIwANLuqdM1AMwhMn8EAXJnQJeUckBUhoAoXscFnm/IDf35EGDHjRg6BOXLjm+HVYaMCERW8mBlbI"
-                        "hGQQsIdEutznnDmBqSGghCasQFZPKccZmEAGPwEURD+HunbgCaWELcEKh0gDKkrQByroYQhIiIABtLxcTkQ96sXUjA5IkG"
-                        "O+SSS4m3mq2UtpjN89YTvn6GnbVdPYzcAiADT4hdxvCAQqEAA0XOMOCPUekUwkdzvTisgBfhBewX/OB47otEQ85x0fPKHt"
-                        "BgBUmCRjADjwvfJOi4EjbCoZpYRhEkEwRKaeIg0krA0Ef4gKPDgR/4MgVEMpBw5ABjzxDF+cfmSKcFJVJdPAo7TuXOOpwF"
-                        "aZIgs/zbDYyx7CEZ4CBEs0USeBPQpVl61zJATP+M4yGJTudhQJiucHVIAKEPSQ9y0bAAKOUDhTskGHOY8+Kf0Xj5Y7P2aZ"
-                        "AijxsBJ7EgHQg6nwAjtogzOIgy9gAyPQgWN7iipgu6tICjKAEuoawFvpOAjpl6PgAGrxpy9hql9BBaTgAHTTkGb4wFvpAg"
-                        "NMCiVgF1noEvOaL6S4BihptRgklWOAkpNCirGDED8DEkw4GKUQApgBQlIxtavYNKQwBY4hAGoAklc6GPQ6iiiMiM17QkJx"
-                        "Pg0xiqRQQpepASH7jv8xeBkPLBIjscAw9JIVMJIMiKmkUDx8AY06mpCTyUAjATKwkcNBAT6JoAWmKKkIQIFioAE1oxYHOE"
-                        "Ht4IRNMBYEMYAKoAELMIAIaISlaML3GkQv0SHFKgHL8IZT8MLnOrnMCIMyg5ICqABe4IPKGIUoXMFQ9JIUrCoGODPNQDRj"
-                        "QQBUs4w20EUooQNB0AwnEDfJAENcFJIk2BgE8ATuoIRifBIDcIGeeIog0EJjUaXtcAUakQw9c0Yh0RibiAIdMD3u+ER2QQ"
-                        "AImIVQcIVYkAJqCANqaAQPGINjcAGxw5cCQLvuOAEXSKADULFyvBAlsIEe6AAfAJJa4hgeaTsCGIX/C0mFHfADLCCBSERI"
-                        "3mEDAFy8J6EBSuvIqHOukNzBkhQ8JDBClDQjlTw9X3HJyYHJ1fIBHRACEqgFWtAEb8iepSChmRSPWmiKP3CEr6OFhWkEba"
-                        "vJkhkDEoi7o8jD1ICAkToKGxRKyaAOpfCA1asqefoJIICAHWhKUeGAIkANN2QIVKAyG0kNC5C9nxCF58vKG1CKVziR3Rq3"
-                        "pEgsBviBPShLL0mCO1A1ieiBpCjEpqorpHiC61sbQEIKX9iAP5QIU0CKW1gubjC/wKSQKhi7pDAGKAGNQ1CKOig0yqRLI9"
-                        "EJAmCCpPACkBQP0kQKaOkgB5iAFtA4zuwOCHm7o5gF/3Y5hqUoPCMRAToAMRYYhCd5g3X0iXSgsl9Jii1gO1jTTc5QLKWg"
-                        "v8i7Do5MiiCgBDqIgmKIgEGgghjIv4SIhjbog0FAAQjIAG0wg1jQPqY4mJ88ChIQNV6rTs4IBvGwz59YF3whgCkUFYOjlt"
-                        "48CkpMDS7cz8wAApARAKIwnA3kmBHYzEHhBdT8DOz6CX5KTQJt0Mzwhg1disTUkAMgR0K5N3yxtqWIAQBkvhDNjHY0I2RM"
-                        "Cl8gmlkclOfhGMBUCp1KENyT0QC7ig0QRqVAhTeIhRKAAWgIAxhgATeYARFwS+QhlHBBjFNogj2AgS7IBh64gl+QAaaQg7"
-                        "AwgFAYUv/MOKEbCDnM8AYhAJmNaTYweYbk26EsyAxTeKBgSlOqiAgDGILt4EAI6cUuGVHkwSnOaEKikLY+dQopuAAryM27"
-                        "a58ucTTxoAUwywxo41BHdQrm3I4xvI4D4IWmOIX//KpOXAppCEHJgAMKsYZ48dRbSYUnaYAyiIafMIIKEIAx8wlR2IALsI"
-                        "HP+gllMNDrWMBZ5aVLghIRqIAoqAA3MREBANGFSILnDAARyIQKiNaWvIpBUNZpMtFf2bGjcMxfEdJwNaUqJJroOYphIpp3"
-                        "U9deipqXIa+jkEmXMat5lRtTUIMWeAKxMwALOARNXYiccxkRSgqPOphmRIo2eAUIuAD/AwABRuiDEeRXCimBQj0KH5ix65"
-                        "gFpSiBAtBQM12KWShZ9zBYhICBxGI7BigdpJCDJZDVjHWKLQAEByiA+UQKsHqStfqJk6SWUlwKr4SSXlCGpLDG6xAATVCK"
-                        "iECCdLVZpCgB69jXpDAWJYhLhrCDlPUqphCE7KShsEgBLCRBY1FLhsDKaFLVqfWJ9uBOnxgiY3EAG0IKGlWs1IKKE5gBLY"
-                        "M41YAA30MKyDMWK3tDidhKt12IbRiPtGWIceUspTCCFmgiBngCLtDGqQAGVLCADhrYUlWKdMCXGD2KK5KIA1RcAJjbgVjM"
-                        "o+gefLFLavtHpTgCayuy1EWIJpCIFFDD/w/jmN71l//BF6NKil4wEabEXQDgBoloKaQghI81FgFAXWfJAtgMl1dNCvELgN"
-                        "JIXgAoh1qIkKUYVI4RQHJZA691jxIFDcrD3RMgkQCYNawlGlIil2ZAX8mgN6Q4gXsJ2e6FgV4IgOldCA8wABkoAV44gi7I"
-                        "g2E4AUQIOx8kGygxABSQgzqQhjDggGdoAj3IgMNcEj8B1+5FhQ0AA4ytjCvIPPHAU2aJrSdBAWK1jCUIgLHq3ikYgUTNDC"
-                        "9ApRJxD8NVisOiENnZoUgwhs0ogNhN3iqwO+1YWw3pAdU6CmUwgE+bCguwgtBrvkC4xknVDBaApO7tBOLVjg6I0CdhAP9G"
-                        "oAQYOIETgAGVcwGBEICUsYwz8BMEmOA+8IEkkIJHsIMsmADrDYvm1Y7g7N425Q4ZONe7MgA4voqopIo84BydDYALGCDRRI"
-                        "BJ6N6cmQIkexmruoyYcxkCCIZM1hl4IJqnu4y94ZhOJeWRSUXxcFjLAOVfaY5WHpsWopYCQGXMKMGDySxbHhQWSANNoAVa"
-                        "cIEiIMumEOIEzCLOGN9faQAu7k4mEAJFsAFa0IMOgGJgtowiwNYSuYAmW4pD/ZUEs05jSdGkKAXTFQ8XUFhulooU3qFpYI"
-                        "pV8FYIWNk9i4RUxIIiXorae5ICWGF4hgp2MYil2AE2QIIGMIARYIAJeAL/JYgD5O0OQqCCCriAh/sNA+gBUP0JzDSWGiNo"
-                        "puBR0QwAYbgf8aHliNDPkRZfAd0eLvjmJ4kyl1aKQmOX3vmvV9Y5m16KmnAZih4bdj6YGPPpo3hfl0HVp5FndkHQo14Idi"
-                        "UaNBWbdOBpQIRqn2hiis2Am8CXitSZkuauTWyits1qhPiCTGgBs04IaCgEAyjjJ6mBbfYXQzjW/VEE7l0IaIiFCYDMs34K"
-                        "KUhqM94EHV0IDgAFogSSNNCGZGaIP6iFqwZIwPaOUEDfAtjETGiAexEAkrSQBCqACMiETJhpI8E0yv4OLS6aERgSESsa90"
-                        "HtCfEAKXqZWwwSB2tDDYvt/wkxFZfpkrm0QhjebQrhBG+9jswdkoMhgF8e7gtRL2ph7iFJBHfc2ua2kDUQiER23CDBBUAe"
-                        "t2Gz7stYgzG4Ao8+ij8IWA2JALrukg5AWPG4ALBkCg4IgivggaOzbkLohLGViLRaoaZIgh5AjQPoBQP4gSmog1FhASEAAZ"
-                        "zYAATIgCxgsKXgBE3IOwJwPNT+pSdZImriAijRbaj2WdEMPF7aA+9O36ymQ2o5AMQTJCDgZGN5raPOpYOBy0CS4YNx5JE2"
-                        "bggBAUy2IEm46uswbIKGlaKh5/uBhKWFaZe+X/GgA/aWG1kYciPxYVvWAb0zACvgKKdRgh6nljElaKMtGqudsFuxQUmw5m"
-                        "aUnBsmzxrSteWQ5MOxYda2u1pgDsmDlpuQbNTuXbxYfhowpxaRbuXFE+CcmaO2I3RSzho4EYDWPJxF0nKCTg3QAI0YD6tR"
-                        "xQrQmSHrS40ReKMyDO9RJ/VSN/VTR/VUV/VVZ/VWd/VXh/VYl/VZp/Vat/Vbx/Vc1/Vd5/Ve9/VfB/ZgF/ZhJ/ZiN/ZjR3"
-                        "aqmIdkZ/Zmd/Znh/Zol/Zpp/bhDggAOw==")
 
 
-class BasicShape:
-    def __init__(self, pen: turtle.Turtle) -> None:
+@dataclass(frozen=True)
+class Layer:
+    """
+    场景图层名，按叠放顺序从下到上排列
+    """
+    BACKGROUND = "background"
+    BUILDING = "building"
+    DESCRIPTION = "description"
+    LIONDANCE = "liondance"
+    CANTONESE = "cantonese"
+    NOTICE = "notice"
+
+
+class AssetPack:
+    def __init__(self, directory: str) -> None:
         """
-        初始化基础图形绘制类
-        :param pen: Turtle画笔对象
+        初始化资源包，资源在首次访问时才从磁盘读取
+        :param directory: 资源包目录，其中的index.json记录可用资源
         """
-        self.pen = pen
+        self.directory = directory
+        self._index: Optional[dict] = None
+        self._data = {}
 
-    def Line(self, length: int, heading: int = 0,
-             pencolor: Optional[Union[Tuple[int, int, int], str]] = "black") -> None:
+    @property
+    def index(self) -> dict:
         """
-        直线
-        :param length: 直线长度
-        :param heading: 直线的方向（角度）
-        :param pencolor: 线条颜色
+        资源索引，首次访问时读取
+        :return: 资源名到资源信息的映射
         """
-        self.pen.pencolor(pencolor)
-        self.pen.setheading(heading)
+        if self._index is None:
+            with open(os.path.join(self.directory, "index.json"), encoding="utf-8") as f:
+                self._index = json.load(f)
+        return self._index
 
-        self.pen.pendown()
-        self.pen.forward(length)
-        self.pen.penup()
+    def names(self) -> List[str]:
+        """
+        获取全部可用资源名
+        :return: 资源名列表
+        """
+        return list(self.index)
 
-    def polygon(self, length: int, side: int = 4, pencolor: Optional[Union[Tuple[int, int, int], str]] = "black",
-                fillcolor: Optional[Union[Tuple[int, int, int], str]] = None) -> None:
+    def get(self, name: str) -> bytes:
         """
-        正多边形
-        :param length: 多边形边长
-        :param side: 多边形边数
-        :param pencolor: 线条颜色
-        :param fillcolor: 填充颜色
+        获取资源内容，首次访问时通过内存映射读取
+        :param name: 资源名
+        :return: 资源的二进制内容
         """
-        self.pen.pencolor(pencolor)
+        if name not in self._data:
+            if name not in self.index:
+                raise KeyError(f"unknown asset {name!r}")
+            with open(os.path.join(self.directory, self.index[name]["file"]), "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    self._data[name] = mm[:]
+        return self._data[name]
 
-        self.pen.pendown()
-        if fillcolor:
-            self.pen.fillcolor(fillcolor)
-            self.pen.begin_fill()
-        for _ in range(side):
-            self.pen.forward(length)
-            self.pen.right(360 / side)
-        if fillcolor:
-            self.pen.end_fill()
-        self.pen.penup()
 
-        self.pen.fillcolor("white")
+# 资源包
+ASSETS = AssetPack(os.path.join(getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))), "assets"))
 
-    def rect(self, length: Tuple[int, int], pencolor: Optional[Union[Tuple[int, int, int], str]] = "black",
-             fillcolor: Optional[Union[Tuple[int, int, int], str]] = None) -> None:
-        """
-        矩形
-        :param length: 矩形的长和宽
-        :param pencolor: 线条颜色
-        :param fillcolor: 填充颜色
-        """
-        self.pen.pencolor(pencolor)
 
-        self.pen.pendown()
-        if fillcolor:
-            self.pen.fillcolor(fillcolor)
-            self.pen.begin_fill()
-        for _ in range(2):
-            for i in length:
-                self.pen.forward(i)
-                self.pen.right(90)
-        if fillcolor:
-            self.pen.end_fill()
-        self.pen.penup()
+Color = Union[Tuple[int, int, int], Tuple[float, float, float], str]
+Point = Tuple[float, float]
 
-        self.pen.fillcolor("white")
 
-    def half_ellipse(self, a: Union[int, float], b: Union[int, float],
-                     center: Tuple[Union[int, float], Union[int, float]],
-                     direction: Literal["up", "down"] = "up") -> None:
+@dataclass(frozen=True)
+class Polyline:
+    """
+    折线图元
+    """
+    points: Tuple[Point, ...]
+    color: Color = "black"
+    width: Union[int, float] = 1
+
+    def translated(self, dx: float, dy: float) -> "Polyline":
+        return Polyline(tuple((x + dx, y + dy) for x, y in self.points), self.color, self.width)
+
+
+@dataclass(frozen=True)
+class Polygon:
+    """
+    填充多边形图元（无边框）
+    """
+    points: Tuple[Point, ...]
+    fillcolor: Color = "black"
+
+    def translated(self, dx: float, dy: float) -> "Polygon":
+        return Polygon(tuple((x + dx, y + dy) for x, y in self.points), self.fillcolor)
+
+
+@dataclass(frozen=True)
+class TextItem:
+    """
+    文本图元
+    """
+    pos: Point
+    text: str
+    font: Tuple[str, int, str] = ("Arial", 8, "normal")
+    align: Literal["left", "center", "right"] = "left"
+    color: Color = "black"
+
+    def translated(self, dx: float, dy: float) -> "TextItem":
+        return TextItem((self.pos[0] + dx, self.pos[1] + dy), self.text, self.font, self.align, self.color)
+
+
+@dataclass(frozen=True)
+class ImageItem:
+    """
+    图像图元，位置为图像中心
+    """
+    pos: Point
+    data: bytes = field(repr=False)
+
+    def translated(self, dx: float, dy: float) -> "ImageItem":
+        return ImageItem((self.pos[0] + dx, self.pos[1] + dy), self.data)
+
+
+Primitive = Union[Polyline, Polygon, TextItem, ImageItem]
+
+
+def _tk_color(color: Color, colormode: Union[int, float] = 1.0) -> str:
+    """
+    将turtle颜色转换为Tk颜色字符串
+    :param color: 颜色名称或RGB元组
+    :param colormode: turtle颜色模式，1.0或255
+    :return: Tk颜色字符串
+    """
+    if isinstance(color, str):
+        return color
+    r, g, b = (round(c * 255 / colormode) for c in color)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def _estimate_text_width(text: str, font: Tuple[str, int, str], scaling: float = 1.0) -> float:
+    """
+    在无显示环境下估算文本宽度：全角字符按字号计，其余字符按字号的0.6倍计
+    :param text: 文本
+    :param font: 字体
+    :param scaling: Tk缩放因子（每磅像素数）
+    :return: 文本宽度
+    """
+    size = font[1] * scaling if font[1] > 0 else -font[1]
+    return sum(size if unicodedata.east_asian_width(char) in "WF" else size * 0.6 for char in text)
+
+
+def _tk_measurer(widget: tkinter.Misc, xscale: float = 1.0) -> Callable[[str, Tuple[str, int, str]], float]:
+    """
+    创建基于Tk字体的文本测量函数
+    :param widget: 任意Tk控件，用于创建字体对象
+    :param xscale: 画布x方向缩放比例
+    :return: 测量函数，参数为文本和字体，返回宽度
+    """
+    fonts = {}
+
+    def measure(text: str, font: Tuple[str, int, str]) -> float:
+        if font not in fonts:
+            fonts[font] = tkinter.font.Font(root=widget, font=font)
+        return fonts[font].measure(text) / xscale
+
+    return measure
+
+
+class Renderer:
+    """
+    渲染后端基类，负责将图元输出到具体的绘图目标
+    """
+    scaling = 1.0
+    # 一个屏幕像素对应的世界坐标长度
+    pixel_size = 1.0
+    # 当前图层，输出的图元归入该图层
+    layer_name: Optional[str] = None
+    # 记录后端编译图元时所代替的实际后端，文本测量和字体度量沿用实际后端
+    target: Optional["Renderer"] = None
+
+    @contextmanager
+    def layer(self, name: str):
         """
-        半个椭圆
-        :param a: 椭圆长半轴
-        :param b: 椭圆短半轴
-        :param center: 椭圆中心坐标
-        :param direction: 椭圆开口方向（"up" 或 "down"）
+        with块内输出的图元归入指定图层
+        :param name: 图层名
         """
-        if direction == "down":
-            start_angle = 180
-            self.pen.goto(center[0] - a, center[1])
-        elif direction == "up":
-            start_angle = 0
-            self.pen.goto(center[0] + a, center[1])
-        else:
-            raise ValueError("unexpected option, should be 'down' or 'up'")
-        end_angle = 360 if direction == "down" else 180
-
-        is_first = True
-        self.pen.pendown()
-        for theta in range(start_angle, end_angle + 1):
-            rad = math.radians(theta)
-            x = a * math.cos(rad)
-            y = b * math.sin(rad)
+        previous, self.layer_name = self.layer_name, name
+        try:
+            yield self
+        finally:
+            self.layer_name = previous
 
-            if is_first:
-                is_first = False
-                continue
-            else:
-                self.pen.goto(center[0] + x, center[1] + y)
+    def has_layer(self, name: str) -> bool:
+        """
+        图层中是否有已输出的图形对象
+        :param name: 图层名
+        :return: 是否非空
+        """
+        raise NotImplementedError
 
+    def clear_layer(self, name: str) -> None:
+        """
+        删除图层中的全部图形对象
+        :param name: 图层名
+        """
+        raise NotImplementedError
 
-class TextDisplayer:
-    def __init__(self, pen: turtle.Turtle, screen: turtle.Screen()) -> None:
+    def set_layer_visible(self, name: str, visible: bool) -> None:
         """
-        初始化文本显示类
-        :param pen: Turtle画笔对象
-        :param screen: Turtle屏幕对象
+        显示或隐藏图层
+        :param name: 图层名
+        :param visible: 是否显示
         """
-        self.pen = pen
-        self.screen = screen
-        # 记录画笔初始状态
-        self.initial_state = {
-            "pos": pen.pos(),
-            "heading": pen.heading(),
-            "color": pen.pencolor(),
-            "pendown": pen.isdown(),
-            "visible": pen.isvisible()
-        }
+        raise NotImplementedError
 
-    def _get_char_width(self, char: str, font) -> int:
+    def lower_layer(self, name: str) -> None:
         """
-        精确测量字符宽度
-        :param char: 要测量的字符
-        :param font: 字体
-        :return: 字符宽度
+        将图层移到最底层
+        :param name: 图层名
         """
-        # 记录当前位置和撤销栈状态
-        start_x, start_y = self.pen.pos()
-        undo_count = self.pen.undobufferentries()  # 记录当前撤销栈长度
-
-        # 临时绘制字符（会被立即撤销）
-        self.pen.write(char, font=font, move=True)
-        # 计算宽度
-        width = self.pen.xcor() - start_x
-        # 撤销临时绘制（清除痕迹）
-        while self.pen.undobufferentries() > undo_count:
-            self.pen.undo()
-        # 回到初始位置
-        self.pen.goto(start_x, start_y)
-        return width
+        raise NotImplementedError
 
-    def write(self, text: str, font: Tuple[str, int, str] = ("SimHei", 12, "normal"), line_height: int = 30,
-              max_len: int = 500, pencolor: Optional[Union[Tuple[int, int, int], str]] = "black") -> None:
+    def draw(self, prim: Primitive) -> object:
         """
-        输出文本并自动换行
-        :param text: 要显示的文本
-        :param font: 字体
-        :param line_height: 行高
-        :param max_len: 每行最大长度
-        :param pencolor: 文本颜色
+        输出单个图元
+        :param prim: 图元
+        :return: 后端相关的图形对象标识
         """
-        self.pen.pencolor(pencolor)
-        self.pen.undobufferentries()
-        self.pen.setundobuffer(1000)
+        if isinstance(prim, Polyline):
+            return self.polyline(prim)
+        elif isinstance(prim, Polygon):
+            return self.polygon(prim)
+        elif isinstance(prim, TextItem):
+            return self.text(prim)
+        elif isinstance(prim, ImageItem):
+            return self.image(prim)
+        raise TypeError(f"unexpected primitive {prim!r}")
+
+    def draw_all(self, primitives: Iterable[Primitive]) -> None:
+        """
+        一次性输出全部图元
+        :param primitives: 图元列表
+        """
+        for prim in primitives:
+            self.draw(prim)
+        self.update()
 
-        line_start_x, current_y = self.pen.pos()
-        current_x = line_start_x
-        self.pen.hideturtle()
-        self.pen.penup()
+    def polyline(self, prim: Polyline) -> object:
+        raise NotImplementedError
 
-        for char in text:
-            if char == "\n":
-                current_y -= line_height
-                current_x = line_start_x
-                self.pen.goto(current_x, current_y)
-                continue
-            char_width = self._get_char_width(char, font)
-            if (current_x - line_start_x) + char_width > max_len:
-                current_y -= line_height
-                current_x = line_start_x
-                self.pen.goto(current_x, current_y)
-            self.pen.goto(current_x, current_y)
-            self.pen.pendown()
-            self.pen.write(char, font=font)
-            self.pen.penup()
-            current_x += char_width
-        self.pen.goto(self.initial_state["pos"][0], self.initial_state["pos"][1])
-        self.pen.setheading(self.initial_state["heading"])
-        self.pen.pencolor(self.initial_state["color"])
-        if self.initial_state["pendown"]:
-            self.pen.pendown()
-        else:
-            self.pen.penup()
-        if self.initial_state["visible"]:
-            self.pen.showturtle()
+    def polygon(self, prim: Polygon) -> object:
+        raise NotImplementedError
 
-        self.pen.setundobuffer(0)
-        self.pen.pencolor("black")
+    def text(self, prim: TextItem) -> object:
+        raise NotImplementedError
 
-        self.screen.update()
+    def image(self, prim: ImageItem) -> object:
+        raise NotImplementedError
 
+    def measure(self, text: str, font: Tuple[str, int, str]) -> float:
+        """
+        测量文本宽度
+        :param text: 文本
+        :param font: 字体
+        :return: 文本宽度
+        """
+        return _estimate_text_width(text, font, self.scaling)
 
-class ImageDisplayer:
-    def __init__(self, screen: turtle.Screen) -> None:
+    def delete(self, items: Iterable[object]) -> None:
         """
-        初始化图像显示类
-        :param screen: Turtle屏幕对象
+        删除已输出的图形对象
+        :param items: draw返回的图形对象标识
         """
-        self.screen = screen
+        raise NotImplementedError
 
-    def show_img(self, x: int, y: int, base64_data: str) -> turtle.Turtle:
+    def set_cursor_visible(self, visible: bool) -> None:
         """
-        显示Base64编码的Logo图片
-        :param x: 图片显示的x坐标
-        :param y: 图片显示的y坐标
-        :param base64_data: Base64编码的图片数据，GIF格式
-        :return: 显示图片的Turtle对象
+        显示或隐藏画笔光标，只有turtle后端有光标
+        :param visible: 是否显示
+        """
+
+    def update(self) -> None:
+        """
+        刷新绘图目标
         """
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".gif") as temp_file:
-            temp_path = temp_file.name
-            img_data = base64.b64decode(base64_data)
-            temp_file.write(img_data)
 
-        self.screen.addshape(temp_path)
 
-        logo_turtle = turtle.Turtle(shape=temp_path)
-        logo_turtle.penup()
-        logo_turtle.goto(x, y)
+class RecordingRenderer(Renderer):
+    def __init__(self, measure: Optional[Callable[[str, Tuple[str, int, str]], float]] = None,
+                 scaling: float = 1.0, target: Optional[Renderer] = None) -> None:
+        """
+        初始化无头记录后端，只记录图元，不需要显示环境
+        :param measure: 文本测量函数，默认按字号估算
+        :param scaling: Tk缩放因子
+        :param target: 为该后端预先编译图元，测量、缩放和像素大小都取自该后端
+        """
+        if target is not None:
+            measure, scaling = target.measure, target.scaling
+            self.pixel_size = target.pixel_size
+        self.target = target
+        self.scaling = scaling
+        self._measure = measure
+        self._items = {}
+        self._layers = {}
+        self._hidden = set()
+        self._next_id = 0
+
+    @property
+    def primitives(self) -> List[Primitive]:
+        """
+        按叠放顺序排列的现存图元，不含隐藏图层
+        :return: 图元列表
+        """
+        return [prim for item, prim in self._items.items() if self._layers.get(item) not in self._hidden]
 
-        return logo_turtle
+    def draw(self, prim: Primitive) -> int:
+        self._next_id += 1
+        self._items[self._next_id] = prim
+        if self.layer_name is not None:
+            self._layers[self._next_id] = self.layer_name
+        return self._next_id
 
+    def delete(self, items: Iterable[int]) -> None:
+        for item in items:
+            self._items.pop(item, None)
+            self._layers.pop(item, None)
 
-class Qilou:
-    def __init__(self, pen: turtle.Turtle) -> None:
+    def items(self) -> List[Tuple[int, Primitive]]:
         """
-        初始化骑楼绘制类
-        :param pen: Turtle画笔对象
+        按叠放顺序排列的现存图元及其标识，不含隐藏图层
+        :return: (标识, 图元)列表
         """
-        self.pen = pen
-        self.shape = BasicShape(self.pen)
+        return [(item, prim) for item, prim in self._items.items() if self._layers.get(item) not in self._hidden]
 
-    def draw_window(self, left: bool = True) -> turtle.Vec2D:
+    def layer_of(self, item: int) -> Optional[str]:
         """
-        绘制骑楼的窗户
-        :param left: 窗户是否在左侧
-        :return: 窗户绘制起点的坐标
+        获取图元所属的图层
+        :param item: 图元标识
+        :return: 图层名，不属于任何图层时为None
         """
-        start_x, start_y = self.pen.pos()
-        self.pen.pensize(1)
+        return self._layers.get(item)
 
-        self.shape.polygon(15, fillcolor="#46BFC7")
-        self.pen.goto(self.pen.xcor() + 15 * 1.5, self.pen.ycor())
-        self.shape.polygon(15, fillcolor="#46BFC7")
-        self.pen.goto(self.pen.xcor() - 15 * 1.5, self.pen.ycor() - 15 * 1.5)
-        self.shape.polygon(15, fillcolor="#46BFC7")
-        self.pen.goto(self.pen.xcor() + 15 * 1.5, self.pen.ycor())
-        self.shape.polygon(15, fillcolor="#46BFC7")
+    def has_layer(self, name: str) -> bool:
+        return name in self._layers.values()
 
-        self.pen.pensize(2)
-        if left:
-            self.pen.goto(start_x - 5, start_y + 20)
-        else:
-            self.pen.goto(start_x - 5, start_y + 5)
-        self.pen.setheading(0)
-        self.shape.polygon(48)
+    def clear_layer(self, name: str) -> None:
+        self.delete([item for item, layer in self._layers.items() if layer == name])
 
-        if left:
-            self.pen.goto(start_x - 5, start_y + 20)
+    def set_layer_visible(self, name: str, visible: bool) -> None:
+        if visible:
+            self._hidden.discard(name)
         else:
-            self.pen.goto(start_x - 5, start_y + 5)
-        self.pen.pendown()
-        self.pen.setheading(90)
-        self.pen.circle(-24, 180)
-        self.pen.penup()
+            self._hidden.add(name)
 
-        self.pen.fillcolor("#46BFC7")
-        self.pen.begin_fill()
-        if left:
-            self.pen.goto(start_x + 6, start_y + 25)
-        else:
-            self.pen.goto(start_x + 6, start_y + 10)
-        self.pen.pendown()
-        self.pen.setheading(90)
-        self.pen.circle(-14, 180)
-        self.pen.penup()
-        if left:
-            self.pen.goto(start_x + 6, start_y + 25)
-        else:
-            self.pen.goto(start_x + 6, start_y + 10)
-        self.pen.setheading(0)
-        self.pen.pendown()
-        self.pen.forward(28)
-        self.pen.end_fill()
-        self.pen.penup()
-        self.pen.fillcolor("white")
+    def lower_layer(self, name: str) -> None:
+        lowered = {item: prim for item, prim in self._items.items() if self._layers.get(item) == name}
+        self._items = {**lowered, **{item: prim for item, prim in self._items.items() if item not in lowered}}
 
-        return turtle.Vec2D(start_x, start_x)
+    def measure(self, text: str, font: Tuple[str, int, str]) -> float:
+        if self._measure is None:
+            return super().measure(text, font)
+        return self._measure(text, font)
 
-    def _single_pillar(self, extra: bool = False) -> None:
-        """
-        绘制一根骑楼的柱子
-        :param extra: 是否额外绘制
-        """
+
+def _primitives_bbox(primitives: Iterable[Primitive]) -> Tuple[float, float, float, float]:
+    """
+    计算图元的包围盒，文字和图片只计锚点
+    :param primitives: 图元
+    :return: 包围盒(x0, y0, x1, y1)，没有图元时为全0
+    """
+    points = [p for prim in primitives for p in (prim.points if isinstance(prim, (Polyline, Polygon)) else (prim.pos,))]
+    if not points:
+        return 0, 0, 0, 0
+    xs, ys = [x for x, _ in points], [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _boxes_intersect(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _same_point(a: Point, b: Point) -> bool:
+    return abs(a[0] - b[0]) < 1e-9 and abs(a[1] - b[1]) < 1e-9
+
+
+def _merge_pair(a: Primitive, b: Primitive, box_a: Tuple[float, float, float, float],
+                box_b: Tuple[float, float, float, float]) -> Optional[Primitive]:
+    """
+    尝试把图元b合并进图元a
+    :param a: 先输出的图元
+    :param b: 后输出的图元
+    :param box_a: a的包围盒
+    :param box_b: b的包围盒
+    :return: 合并后的图元，不能合并时为None
+    """
+    if isinstance(a, Polyline) and isinstance(b, Polyline) and (a.color, a.width) == (b.color, b.width):
+        if _same_point(a.points[-1], b.points[0]):
+            points = a.points + b.points[1:]
+        elif _same_point(a.points[-1], b.points[-1]):
+            points = a.points + b.points[-2::-1]
+        elif _same_point(a.points[0], b.points[-1]):
+            points = b.points + a.points[1:]
+        elif _same_point(a.points[0], b.points[0]):
+            points = b.points[::-1] + a.points[1:]
+        else:
+            return None
+        return Polyline(points, a.color, a.width)
+    if isinstance(a, Polygon) and isinstance(b, Polygon) and a.fillcolor == b.fillcolor \
+            and not _boxes_intersect(box_a, box_b):
+        # 从a的起点到b的起点往返各走一次，连接边不围出面积，两块互不重叠的填充合为一个多边形
+        return Polygon(a.points + (a.points[0],) + b.points + (b.points[0], a.points[0]), a.fillcolor)
+    return None
+
+
+def coalesce(primitives: Iterable[Primitive]) -> List[Primitive]:
+    """
+    合并图元以减少画布对象：首尾相接且颜色、线宽相同的折线合并为一条折线，
+    包围盒互不相交的同色填充合并为一个多边形。
+    合并会把后一个图元提前到前一个图元的位置，只有它与中间的图元包围盒都不相交时才合并，叠放效果不变
+    :param primitives: 按输出顺序排列的图元
+    :return: 合并后的图元
+    """
+    result: List[Primitive] = []
+    boxes: List[Tuple[float, float, float, float]] = []
+    for prim in primitives:
+        box = _primitives_bbox((prim,))
+        for i in range(len(result) - 1, -1, -1):
+            merged = _merge_pair(result[i], prim, boxes[i], box)
+            if merged is not None:
+                result[i] = merged
+                boxes[i] = (min(boxes[i][0], box[0]), min(boxes[i][1], box[1]),
+                            max(boxes[i][2], box[2]), max(boxes[i][3], box[3]))
+                break
+            if _boxes_intersect(boxes[i], box):
+                result.append(prim)
+                boxes.append(box)
+                break
+        else:
+            result.append(prim)
+            boxes.append(box)
+    return result
+
+
+class SvgRenderer(RecordingRenderer):
+    """
+    SVG后端，记录图元并导出为SVG文件，不需要显示环境
+    """
+    _anchors = {"left": "start", "center": "middle", "right": "end"}
+
+    def bbox(self) -> Tuple[float, float, float, float]:
+        """
+        计算全部图元的包围盒，文字和图片只计锚点
+        :return: 包围盒(x0, y0, x1, y1)
+        """
+        return _primitives_bbox(self.primitives)
+
+    @staticmethod
+    def _points(points: Tuple[Point, ...]) -> str:
+        return " ".join(f"{x:.2f},{-y:.2f}" for x, y in points)
+
+    def _element(self, prim: Primitive) -> str:
+        """
+        将图元转换为SVG元素
+        :param prim: 图元
+        :return: SVG元素字符串
+        """
+        if isinstance(prim, Polyline):
+            return (f'<polyline points="{self._points(prim.points)}" fill="none" stroke="{_tk_color(prim.color)}" '
+                    f'stroke-width="{prim.width}" stroke-linecap="round" stroke-linejoin="round"/>')
+        if isinstance(prim, Polygon):
+            return f'<polygon points="{self._points(prim.points)}" fill="{_tk_color(prim.fillcolor)}" stroke="none"/>'
+        if isinstance(prim, TextItem):
+            family, size, style = (tuple(prim.font) + ("normal",))[:3]
+            weight = "bold" if "bold" in style else "normal"
+            slant = "italic" if "italic" in style else "normal"
+            return (f'<text x="{prim.pos[0]:.2f}" y="{-prim.pos[1]:.2f}" font-family="{escape(family)}" '
+                    f'font-size="{abs(size)}pt" font-weight="{weight}" font-style="{slant}" '
+                    f'text-anchor="{self._anchors[prim.align]}" dominant-baseline="text-after-edge" '
+                    f'fill="{_tk_color(prim.color)}" xml:space="preserve">{escape(prim.text)}</text>')
+        width, height = int.from_bytes(prim.data[6:8], "little"), int.from_bytes(prim.data[8:10], "little")
+        return (f'<image x="{prim.pos[0] - width / 2:.2f}" y="{-prim.pos[1] - height / 2:.2f}" '
+                f'width="{width}" height="{height}" '
+                f'href="data:image/gif;base64,{base64.b64encode(prim.data).decode("ascii")}"/>')
+
+    def to_svg(self, margin: Union[int, float] = 20) -> str:
+        """
+        导出为SVG文档
+        :param margin: 包围盒外的留白
+        :return: SVG文档字符串
+        """
+        x0, y0, x1, y1 = self.bbox()
+        width, height = x1 - x0 + 2 * margin, y1 - y0 + 2 * margin
+        lines = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+                 f'viewBox="{x0 - margin:.2f} {-y1 - margin:.2f} {width:.2f} {height:.2f}">',
+                 f'<rect x="{x0 - margin:.2f}" y="{-y1 - margin:.2f}" width="{width:.2f}" height="{height:.2f}" '
+                 f'fill="white"/>']
+        lines += [self._element(prim) for prim in self.primitives]
+        lines.append("</svg>")
+        return "\n".join(lines)
+
+    def save(self, path: str, margin: Union[int, float] = 20) -> None:
+        """
+        保存为SVG文件
+        :param path: 文件路径
+        :param margin: 包围盒外的留白
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_svg(margin))
+
+
+class _CanvasLayers:
+    """
+    用Tk画布标签实现图层，要求子类提供canvas属性
+    """
+    canvas: tkinter.Canvas
+
+    @staticmethod
+    def _tag(name: str) -> str:
+        return f"layer-{name}"
+
+    def has_layer(self, name: str) -> bool:
+        return bool(self.canvas.find_withtag(self._tag(name)))
+
+    def clear_layer(self, name: str) -> None:
+        self.canvas.delete(self._tag(name))
+
+    def set_layer_visible(self, name: str, visible: bool) -> None:
+        self.canvas.itemconfigure(self._tag(name), state=tkinter.NORMAL if visible else tkinter.HIDDEN)
+
+    def lower_layer(self, name: str) -> None:
+        if self.has_layer(name):
+            self.canvas.tag_lower(self._tag(name))
+
+
+class _CanvasZoom:
+    """
+    缩放Tk画布上已有的对象，要求子类提供canvas属性，并在创建文字对象时调用_track_text
+    """
+    canvas: tkinter.Canvas
+    # 文字对象的标签，缩放时据此找到需要调整字号的对象
+    TEXT_TAG = "text"
+    # 字号档位：缩放比例每变化2的1/FONT_STEPS次方换一档，同一档内不调整已有文字
+    FONT_STEPS = 4
+    # 相对初始比例的缩放倍数，文本排版始终按初始比例测量
+    zoom = 1.0
+
+    def _track_text(self, item: int, font: Tuple[str, int, str]) -> None:
+        if not hasattr(self, "_fonts"):
+            self._fonts = {}
+        self.canvas.addtag_withtag(self.TEXT_TAG, item)
+        self._fonts[item] = font
+
+    def _forget(self, items: Iterable[int]) -> None:
+        fonts = getattr(self, "_fonts", {})
+        for item in items:
+            fonts.pop(item, None)
+
+    @property
+    def font_bucket(self) -> int:
+        """
+        当前缩放倍数所在的字号档位
+        """
+        return round(math.log2(self.zoom) * self.FONT_STEPS)
+
+    def _font(self, font: Tuple[str, int, str]) -> Tuple[str, int, str]:
+        if self.zoom == 1.0:
+            return font
+        family, size, style = font
+        return family, max(1, round(size * 2 ** (self.font_bucket / self.FONT_STEPS))), style
+
+    def rescale(self, factor: float) -> None:
+        """
+        以画布原点为中心缩放画布上已有的全部对象，之后输出的图元按新比例绘制；
+        文字的字号只在档位变化时重新设置，图片保持原大小
+        :param factor: 缩放倍数
+        """
+        bucket = self.font_bucket
+        self.canvas.scale("all", 0, 0, factor, factor)
+        self.zoom *= factor
+        self.pixel_size /= factor
+        if self.font_bucket != bucket:
+            items = self.canvas.find_withtag(self.TEXT_TAG)
+            fonts = getattr(self, "_fonts", {})
+            self._fonts = {item: fonts[item] for item in items if item in fonts}
+            for item, font in self._fonts.items():
+                self.canvas.itemconfigure(item, font=self._font(font))
+
+
+class CanvasRenderer(_CanvasZoom, _CanvasLayers, Renderer):
+    _shared = {}
+    _anchors = {"left": "sw", "center": "s", "right": "se"}
+
+    def __init__(self, canvas: tkinter.Canvas, xscale: float = 1.0, yscale: float = 1.0,
+                 colormode: Union[int, float] = 1.0) -> None:
+        """
+        初始化Tk画布后端，直接创建画布对象，绕过turtle的逐步动画
+        :param canvas: Tk画布，坐标原点位于画布中心
+        :param xscale: x方向缩放比例
+        :param yscale: y方向缩放比例
+        :param colormode: RGB元组颜色的取值范围，1.0或255
+        """
+        self.canvas = canvas
+        self.xscale = xscale
+        self.yscale = yscale
+        self.colormode = colormode
+        self.scaling = round(float(canvas.tk.call("tk", "scaling")), 3)
+        self.pixel_size = 1 / max(abs(xscale), abs(yscale))
+        self.images = ImageCache.for_widget(canvas)
+        self._measure = _tk_measurer(canvas, xscale)
+
+    @classmethod
+    def for_screen(cls, screen: turtle.TurtleScreen) -> "CanvasRenderer":
+        """
+        获取绘制到Turtle屏幕画布上的共享后端
+        :param screen: Turtle屏幕对象
+        :return: 画布后端
+        """
+        if id(screen) not in cls._shared:
+            cls._shared[id(screen)] = cls(screen.getcanvas(), screen.xscale, screen.yscale, screen.colormode())
+        return cls._shared[id(screen)]
+
+    def _coords(self, points: Iterable[Point]) -> List[float]:
+        return [c for x, y in points for c in (x * self.xscale, -y * self.yscale)]
+
+    def _tags(self) -> Tuple[str, ...]:
+        return (self._tag(self.layer_name),) if self.layer_name is not None else ()
+
+    def polyline(self, prim: Polyline) -> int:
+        return self.canvas.create_line(*self._coords(prim.points), fill=_tk_color(prim.color, self.colormode),
+                                       width=prim.width, capstyle=tkinter.ROUND, tags=self._tags())
+
+    def polygon(self, prim: Polygon) -> int:
+        return self.canvas.create_polygon(*self._coords(prim.points),
+                                          fill=_tk_color(prim.fillcolor, self.colormode), outline="",
+                                          tags=self._tags())
+
+    def text(self, prim: TextItem) -> int:
+        item = self.canvas.create_text(prim.pos[0] * self.xscale - 1, -prim.pos[1] * self.yscale, text=prim.text,
+                                       anchor=self._anchors[prim.align], font=self._font(prim.font),
+                                       fill=_tk_color(prim.color, self.colormode), tags=self._tags())
+        self._track_text(item, prim.font)
+        return item
+
+    def rescale(self, factor: float) -> None:
+        super().rescale(factor)
+        self.xscale *= factor
+        self.yscale *= factor
+
+    def image(self, prim: ImageItem) -> int:
+        return self.canvas.create_image(prim.pos[0] * self.xscale, -prim.pos[1] * self.yscale,
+                                        image=self.images.photo(prim.data), tags=self._tags())
+
+    def measure(self, text: str, font: Tuple[str, int, str]) -> float:
+        return self._measure(text, font)
+
+    def delete(self, items: Iterable[int]) -> None:
+        items = list(items)
+        if items:
+            self.canvas.delete(*items)
+            self._forget(items)
+
+    def update(self) -> None:
+        self.canvas.update_idletasks()
+
+
+class StatePen:
+    """
+    turtle画笔的状态缓存代理：记录画笔颜色、填充颜色、线宽、朝向和抬落笔状态，跳过不改变状态的调用，
+    其余属性原样转发给被代理的画笔。假定turtle使用默认的"standard"角度模式
+    """
+
+    def __init__(self, pen: turtle.RawTurtle) -> None:
+        """
+        初始化状态缓存代理
+        :param pen: 被代理的Turtle画笔，保存在_pen中，pen属性保留为turtle的pen()方法
+        """
+        self._pen = pen
+        self.sync()
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self._pen, name)
+
+    def sync(self) -> None:
+        """
+        从画笔重新读取状态，画笔被绕过代理修改后调用
+        """
+        self._pencolor = self._pen.pencolor()
+        self._fillcolor = self._pen.fillcolor()
+        self._pensize = self._pen.pensize()
+        self._heading: Optional[float] = self._pen.heading()
+        self._down = self._pen.isdown()
+        self._visible = self._pen.isvisible()
+
+    def pencolor(self, *args) -> Optional[Color]:
+        if not args:
+            return self._pencolor
+        color = args[0] if len(args) == 1 else args
+        if color != self._pencolor:
+            self._pen.pencolor(*args)
+            self._pencolor = color
+
+    def fillcolor(self, *args) -> Optional[Color]:
+        if not args:
+            return self._fillcolor
+        color = args[0] if len(args) == 1 else args
+        if color != self._fillcolor:
+            self._pen.fillcolor(*args)
+            self._fillcolor = color
+
+    def color(self, *args) -> Optional[Tuple[Color, Color]]:
+        if not args:
+            return self._pencolor, self._fillcolor
+        if len(args) == 2:
+            self.pencolor(args[0])
+            self.fillcolor(args[1])
+        else:
+            self.pencolor(*args)
+            self.fillcolor(*args)
+
+    def pensize(self, width: Optional[Union[int, float]] = None) -> Optional[Union[int, float]]:
+        if width is None:
+            return self._pensize
+        if width != self._pensize:
+            self._pen.pensize(width)
+            self._pensize = width
+
+    width = pensize
+
+    def heading(self) -> float:
+        if self._heading is None:
+            self._heading = self._pen.heading()
+        return self._heading
+
+    def setheading(self, to_angle: Union[int, float]) -> None:
+        to_angle = float(to_angle) % 360
+        if to_angle != self._heading:
+            self._pen.setheading(to_angle)
+            self._heading = to_angle
+
+    seth = setheading
+
+    def left(self, angle: Union[int, float]) -> None:
+        self._pen.left(angle)
+        if self._heading is not None:
+            self._heading = (self._heading + angle) % 360
+
+    lt = left
+
+    def right(self, angle: Union[int, float]) -> None:
+        self._pen.right(angle)
+        if self._heading is not None:
+            self._heading = (self._heading - angle) % 360
+
+    rt = right
+
+    def circle(self, *args, **kwargs) -> None:
+        self._pen.circle(*args, **kwargs)
+        self._heading = None
+
+    def home(self) -> None:
+        self._pen.home()
+        self._heading = 0.0
+
+    def pen(self, pen: Optional[dict] = None, **pendict) -> Optional[dict]:
+        result = self._pen.pen(pen, **pendict)
+        if pen or pendict:
+            self.sync()
+        return result
+
+    def reset(self) -> None:
+        self._pen.reset()
+        self.sync()
+
+    def clear(self) -> None:
+        self._pen.clear()
+        self.sync()
+
+    def undo(self) -> None:
+        # 撤销可能恢复颜色、线宽、朝向等任意状态
+        self._pen.undo()
+        self.sync()
+
+    def isvisible(self) -> bool:
+        return self._visible
+
+    def showturtle(self) -> None:
+        if not self._visible:
+            self._pen.showturtle()
+            self._visible = True
+
+    st = showturtle
+
+    def hideturtle(self) -> None:
+        if self._visible:
+            self._pen.hideturtle()
+            self._visible = False
+
+    ht = hideturtle
+
+    def isdown(self) -> bool:
+        return self._down
+
+    def pendown(self) -> None:
+        if not self._down:
+            self._pen.pendown()
+            self._down = True
+
+    pd = down = pendown
+
+    def penup(self) -> None:
+        if self._down:
+            self._pen.penup()
+            self._down = False
+
+    pu = up = penup
+
+
+class TurtleRenderer(_CanvasZoom, _CanvasLayers, Renderer):
+    def __init__(self, pen: turtle.Turtle) -> None:
+        """
+        初始化turtle后端，用turtle画笔逐步重放图元，保留绘制动画
+        :param pen: Turtle画笔对象，会包装为StatePen以跳过重复的状态设置
+        """
+        self.pen = pen if isinstance(pen, StatePen) else StatePen(pen)
+        self.screen = pen.getscreen()
+        cv = self.canvas = self.screen.getcanvas()
+        self.scaling = round(float(cv.tk.call("tk", "scaling")), 3)
+        self.pixel_size = 1 / max(abs(self.screen.xscale), abs(self.screen.yscale))
+        self.images = ImageCache.for_widget(cv)
+        self._measure = _tk_measurer(cv, self.screen.xscale)
+
+    @contextmanager
+    def _replay(self):
+        """
+        记录with块内turtle画笔新建的画布对象，归入当前图层。
+        turtle抬笔时会预先新建下一段线条的对象，该对象不属于本次图元
+        :return: 用于收集画布对象编号的列表
+        """
+        first, start = self.pen.currentLineItem, len(self.pen.items)
+        items = []
+        yield items
+        current = self.pen.currentLineItem
+        items.extend(item for item in [first] + self.pen.items[start:] if item != current)
+        if self.layer_name is not None:
+            for item in items:
+                self.canvas.addtag_withtag(self._tag(self.layer_name), item)
+
+    def polyline(self, prim: Polyline) -> Tuple[int, ...]:
+        with self._replay() as items:
+            self.pen.penup()
+            self.pen.goto(prim.points[0])
+            self.pen.pencolor(prim.color)
+            self.pen.pensize(prim.width)
+            self.pen.pendown()
+            for point in prim.points[1:]:
+                self.pen.goto(point)
+            self.pen.penup()
+        return tuple(items)
+
+    def polygon(self, prim: Polygon) -> Tuple[int, ...]:
+        with self._replay() as items:
+            self.pen.penup()
+            self.pen.goto(prim.points[0])
+            self.pen.fillcolor(prim.fillcolor)
+            self.pen.begin_fill()
+            for point in prim.points[1:]:
+                self.pen.goto(point)
+            self.pen.end_fill()
+        return tuple(items)
+
+    def text(self, prim: TextItem) -> Tuple[int, ...]:
+        with self._replay() as items:
+            self.pen.penup()
+            self.pen.goto(prim.pos)
+            self.pen.pencolor(prim.color)
+            self.pen.write(prim.text, align=prim.align, font=self._font(prim.font))
+        for item in items:
+            if self.canvas.type(item) == "text":
+                self._track_text(item, prim.font)
+        return tuple(items)
+
+    def image(self, prim: ImageItem) -> turtle.RawTurtle:
+        logo_turtle = turtle.RawTurtle(self.screen, shape=self.images.shape(self.screen, prim.data))
+        logo_turtle.penup()
+        logo_turtle.goto(prim.pos)
+        return logo_turtle
+
+    def delete(self, items: Iterable[Union[Tuple[int, ...], turtle.RawTurtle]]) -> None:
+        ids = []
+        for item in items:
+            if isinstance(item, turtle.RawTurtle):
+                # 图片画笔从屏幕的画笔列表中移除，否则屏幕会一直持有并刷新它
+                item.hideturtle()
+                if item in self.screen._turtles:
+                    self.screen._turtles.remove(item)
+                self.canvas.delete(item.turtle._item, *item.items)
+            else:
+                ids.extend(item)
+        if ids:
+            self.canvas.delete(*ids)
+            self._forget(ids)
+            # turtle每次移动都会把items复制进撤销记录，已删除的对象不能留在其中
+            deleted = set(ids)
+            self.pen.items[:] = [item for item in self.pen.items if item not in deleted]
+
+    def measure(self, text: str, font: Tuple[str, int, str]) -> float:
+        return self._measure(text, font)
+
+    def set_cursor_visible(self, visible: bool) -> None:
+        if visible:
+            self.pen.showturtle()
+        else:
+            self.pen.hideturtle()
+
+    def update(self) -> None:
+        self.screen.update()
+
+
+def _arc_steps(radius: float, extent: float, tolerance: float) -> int:
+    """
+    按弦高误差计算圆弧的分段数
+    :param radius: 半径
+    :param extent: 圆心角
+    :param tolerance: 允许的最大弦高误差
+    :return: 分段数
+    """
+    radius = abs(radius)
+    if radius <= tolerance:
+        return 1
+    step = 2 * math.degrees(math.acos(1 - tolerance / radius))
+    return max(1, math.ceil(abs(extent) / step))
+
+
+@lru_cache(maxsize=256)
+def _unit_arc(start: float, extent: float, steps: int) -> Tuple[Point, ...]:
+    """
+    单位圆上的圆弧点表
+    :param start: 起始角度
+    :param extent: 圆心角，负数为顺时针
+    :param steps: 分段数
+    :return: 包含起点和终点的steps + 1个点
+    """
+    return tuple((math.cos(math.radians(start + extent * k / steps)), math.sin(math.radians(start + extent * k / steps)))
+                 for k in range(steps + 1))
+
+
+@lru_cache(maxsize=1024)
+def ellipse_arc(a: float, b: float, start: float, extent: float, tolerance: float) -> Tuple[Point, ...]:
+    """
+    细分椭圆弧，结果按参数缓存
+    :param a: x方向半轴
+    :param b: y方向半轴
+    :param start: 起始角度
+    :param extent: 圆心角
+    :param tolerance: 允许的最大弦高误差
+    :return: 相对椭圆中心的点
+    """
+    steps = _arc_steps(max(abs(a), abs(b)), extent, tolerance)
+    return tuple((a * c, b * s) for c, s in _unit_arc(start, extent, steps))
+
+
+class GeometryPen:
+    def __init__(self, renderer: Optional[Renderer] = None,
+                 pos: Tuple[Union[int, float], Union[int, float]] = (0, 0)) -> None:
+        """
+        初始化几何画笔，接口与turtle.Turtle兼容，但只计算图元并交给渲染后端输出
+        :param renderer: 渲染后端，默认为无头记录后端
+        :param pos: 画笔初始位置
+        """
+        self.renderer = renderer if renderer is not None else RecordingRenderer()
+        self._position = (float(pos[0]), float(pos[1]))
+        self._heading = 0.0
+        self._drawing = True
+        self._visible = True
+        self._pencolor: Color = "black"
+        self._fillcolor: Color = "black"
+        self._pensize: Union[int, float] = 1
+        self._line: List[Point] = [self._position]
+        self._fill_path: Optional[List[Point]] = None
+        self._fill_pending: Optional[List[Primitive]] = None
+
+    def _emit(self, prim: Primitive) -> None:
+        """
+        输出图元，填充过程中的图元暂存到填充多边形输出之后
+        :param prim: 图元
+        """
+        if self._fill_pending is not None:
+            self._fill_pending.append(prim)
+        else:
+            self.renderer.draw(prim)
+
+    def _new_line(self) -> None:
+        """
+        结束当前折线并从当前位置开始新的折线
+        """
+        if len(self._line) > 1:
+            self._emit(Polyline(tuple(self._line), self._pencolor, self._pensize))
+        self._line = [self._position]
+
+    def _move(self, x: float, y: float) -> None:
+        """
+        移动画笔并记录轨迹
+        :param x: 目标x坐标
+        :param y: 目标y坐标
+        """
+        self._position = (x, y)
+        if self._drawing:
+            self._line.append(self._position)
+        if self._fill_path is not None:
+            self._fill_path.append(self._position)
+
+    def trace(self, points: List[Point]) -> None:
+        """
+        沿一串点连续移动画笔，等价于逐点goto
+        :param points: 经过的点
+        """
+        if not points:
+            return
+        self._position = points[-1]
+        if self._drawing:
+            self._line.extend(points)
+        if self._fill_path is not None:
+            self._fill_path.extend(points)
+
+    @property
+    def tolerance(self) -> float:
+        """
+        曲线细分允许的弦高误差，按渲染后端的像素大小换算为世界坐标
+        """
+        return TESSELLATION_TOLERANCE * self.renderer.pixel_size
+
+    def pos(self) -> turtle.Vec2D:
+        return turtle.Vec2D(*self._position)
+
+    position = pos
+
+    def xcor(self) -> float:
+        return self._position[0]
+
+    def ycor(self) -> float:
+        return self._position[1]
+
+    def heading(self) -> float:
+        return self._heading
+
+    def setheading(self, to_angle: Union[int, float]) -> None:
+        self._heading = float(to_angle) % 360
+
+    seth = setheading
+
+    def left(self, angle: Union[int, float]) -> None:
+        self.setheading(self._heading + angle)
+
+    def right(self, angle: Union[int, float]) -> None:
+        self.setheading(self._heading - angle)
+
+    def goto(self, x: Union[int, float, Tuple[float, float]], y: Optional[Union[int, float]] = None) -> None:
+        if y is None:
+            x, y = x
+        self._move(float(x), float(y))
+
+    setpos = setposition = goto
+
+    def forward(self, distance: Union[int, float]) -> None:
+        rad = math.radians(self._heading)
+        self._move(self._position[0] + distance * math.cos(rad), self._position[1] + distance * math.sin(rad))
+
+    fd = forward
+
+    def backward(self, distance: Union[int, float]) -> None:
+        self.forward(-distance)
+
+    back = bk = backward
+
+    def home(self) -> None:
+        self.goto(0, 0)
+        self.setheading(0)
+
+    def circle(self, radius: Union[int, float], extent: Optional[Union[int, float]] = None,
+               steps: Optional[int] = None) -> None:
+        """
+        画圆弧，起止位置和朝向与turtle.Turtle.circle一致
+        :param radius: 半径，正数逆时针，负数顺时针
+        :param extent: 圆心角
+        :param steps: 分段数，默认按弦高误差自适应，且不超过turtle的分段数
+        """
+        if extent is None:
+            extent = 360
+        if steps is None:
+            steps = min(1 + int(min(11 + abs(radius) / 6.0, 59.0) * abs(extent) / 360),
+                        _arc_steps(radius, extent, self.tolerance))
+        sign = 1 if radius >= 0 else -1
+        rad = math.radians(self._heading)
+        cx = self._position[0] - radius * math.sin(rad)
+        cy = self._position[1] + radius * math.cos(rad)
+        r = abs(radius)
+        points = _unit_arc(self._heading - 90 * sign, extent * sign, steps)
+        self.trace([(cx + r * c, cy + r * s) for c, s in points[1:]])
+        self.left(extent * sign)
+
+    def pendown(self) -> None:
+        if not self._drawing:
+            self._drawing = True
+            self._new_line()
+
+    pd = down = pendown
+
+    def penup(self) -> None:
+        if self._drawing:
+            self._new_line()
+            self._drawing = False
+
+    pu = up = penup
+
+    def isdown(self) -> bool:
+        return self._drawing
+
+    def pensize(self, width: Optional[Union[int, float]] = None) -> Optional[Union[int, float]]:
+        if width is None:
+            return self._pensize
+        if width != self._pensize:
+            self._new_line()
+            self._pensize = width
+
+    width = pensize
+
+    def pencolor(self, color: Optional[Color] = None) -> Optional[Color]:
+        if color is None:
+            return self._pencolor
+        if color != self._pencolor:
+            self._new_line()
+            self._pencolor = color
+
+    def fillcolor(self, color: Optional[Color] = None) -> Optional[Color]:
+        if color is None:
+            return self._fillcolor
+        self._fillcolor = color
+
+    def filling(self) -> bool:
+        return self._fill_path is not None
+
+    def begin_fill(self) -> None:
+        """
+        开始填充，随后的图元暂存，使填充多边形位于这些线条之下
+        """
+        if not self.filling():
+            self._new_line()
+            self._fill_pending = []
+        self._fill_path = [self._position]
+
+    def end_fill(self) -> None:
+        if self.filling():
+            pending, self._fill_pending = self._fill_pending, None
+            if len(self._fill_path) > 2:
+                self._emit(Polygon(tuple(self._fill_path), self._fillcolor))
+            for prim in pending:
+                self._emit(prim)
+            self._fill_path = None
+
+    def write(self, arg: object, move: bool = False, align: Literal["left", "center", "right"] = "left",
+              font: Tuple[str, int, str] = ("Arial", 8, "normal")) -> None:
+        """
+        输出文本
+        :param arg: 要写的内容
+        :param move: 是否移动到文本末尾
+        :param align: 对齐方式
+        :param font: 字体
+        """
+        self._new_line()
+        text = str(arg)
+        self._emit(TextItem(self._position, text, font, align, self._pencolor))
+        if move:
+            width = self.renderer.measure(text, font)
+            x, y = self._position
+            self.goto(x + width * {"left": 1.0, "center": 0.5, "right": 0.0}[align], y)
+
+    def showturtle(self) -> None:
+        self._visible = True
+        self.renderer.set_cursor_visible(True)
+
+    st = showturtle
+
+    def hideturtle(self) -> None:
+        self._visible = False
+        self.renderer.set_cursor_visible(False)
+
+    ht = hideturtle
+
+    def isvisible(self) -> bool:
+        return self._visible
+
+    def speed(self, speed: Optional[Union[int, float, str]] = None) -> Optional[int]:
+        if speed is None:
+            return 0
+
+    def finish(self) -> None:
+        """
+        结束当前折线，确保已画出的线条全部输出
+        """
+        self._new_line()
+
+
+class BasicShape:
+    def __init__(self, pen: Union[turtle.Turtle, GeometryPen, StatePen]) -> None:
+        """
+        初始化基础图形绘制类
+        :param pen: 画笔对象，Turtle画笔、几何画笔或状态缓存代理
+        """
+        self.pen = pen
+
+    def Line(self, length: int, heading: int = 0,
+             pencolor: Optional[Union[Tuple[int, int, int], str]] = "black") -> None:
+        """
+        直线
+        :param length: 直线长度
+        :param heading: 直线的方向（角度）
+        :param pencolor: 线条颜色
+        """
+        self.pen.pencolor(pencolor)
+        self.pen.setheading(heading)
+
+        self.pen.pendown()
+        self.pen.forward(length)
+        self.pen.penup()
+
+    def polygon(self, length: int, side: int = 4, pencolor: Optional[Union[Tuple[int, int, int], str]] = "black",
+                fillcolor: Optional[Union[Tuple[int, int, int], str]] = None) -> None:
+        """
+        正多边形
+        :param length: 多边形边长
+        :param side: 多边形边数
+        :param pencolor: 线条颜色
+        :param fillcolor: 填充颜色
+        """
+        self.pen.pencolor(pencolor)
+
+        self.pen.pendown()
+        if fillcolor:
+            self.pen.fillcolor(fillcolor)
+            self.pen.begin_fill()
+        for _ in range(side):
+            self.pen.forward(length)
+            self.pen.right(360 / side)
+        if fillcolor:
+            self.pen.end_fill()
+        self.pen.penup()
+
+        self.pen.fillcolor("white")
+
+    def rect(self, length: Tuple[int, int], pencolor: Optional[Union[Tuple[int, int, int], str]] = "black",
+             fillcolor: Optional[Union[Tuple[int, int, int], str]] = None) -> None:
+        """
+        矩形
+        :param length: 矩形的长和宽
+        :param pencolor: 线条颜色
+        :param fillcolor: 填充颜色
+        """
+        self.pen.pencolor(pencolor)
+
+        self.pen.pendown()
+        if fillcolor:
+            self.pen.fillcolor(fillcolor)
+            self.pen.begin_fill()
+        for _ in range(2):
+            for i in length:
+                self.pen.forward(i)
+                self.pen.right(90)
+        if fillcolor:
+            self.pen.end_fill()
+        self.pen.penup()
+
+        self.pen.fillcolor("white")
+
+    def half_ellipse(self, a: Union[int, float], b: Union[int, float],
+                     center: Tuple[Union[int, float], Union[int, float]],
+                     direction: Literal["up", "down"] = "up") -> None:
+        """
+        半个椭圆
+        :param a: 椭圆长半轴
+        :param b: 椭圆短半轴
+        :param center: 椭圆中心坐标
+        :param direction: 椭圆开口方向（"up" 或 "down"）
+        """
+        if direction == "down":
+            start_angle = 180
+        elif direction == "up":
+            start_angle = 0
+        else:
+            raise ValueError("unexpected option, should be 'down' or 'up'")
+        tolerance = self.pen.tolerance if isinstance(self.pen, GeometryPen) else TESSELLATION_TOLERANCE
+        points = ellipse_arc(a, b, start_angle, 180, tolerance)
+
+        self.pen.goto(center[0] + points[0][0], center[1] + points[0][1])
+        self.pen.pendown()
+        path = [(center[0] + x, center[1] + y) for x, y in points[1:]]
+        if isinstance(self.pen, GeometryPen):
+            self.pen.trace(path)
+        else:
+            for point in path:
+                self.pen.goto(point)
+
+
+class FontMetrics:
+    _shared = {}
+
+    def __init__(self, measure: Callable[[str, Tuple[str, int, str]], float], scaling: float = 1.0,
+                 maxsize: int = 4096, cache_path: Optional[str] = None) -> None:
+        """
+        初始化字体度量服务，每个字形只测量一次并缓存
+        :param measure: 测量函数，参数为文本和字体，返回宽度
+        :param scaling: Tk缩放因子，作为缓存键的一部分
+        :param maxsize: 内存缓存的最大条目数
+        :param cache_path: 持久化缓存文件路径，为None时不持久化
+        """
+        self.measure = measure
+        self.scaling = scaling
+        self.maxsize = maxsize
+        self.cache_path = cache_path
+        self._widths: "OrderedDict[Tuple[str, str, int, str, float], float]" = OrderedDict()
+        self._dirty = False
+        if cache_path:
+            self.load()
+
+    @classmethod
+    def for_renderer(cls, renderer: Renderer, cache_dir: Optional[str] = None) -> "FontMetrics":
+        """
+        获取渲染后端共享的字体度量服务，首次调用时创建
+        :param renderer: 渲染后端
+        :param cache_dir: 持久化缓存目录，仅在首次调用时生效
+        :return: 字体度量服务
+        """
+        renderer = renderer.target or renderer
+        if id(renderer) not in cls._shared:
+            scaling = renderer.scaling
+            cache_path = os.path.join(cache_dir, f"font_metrics_{scaling:g}.json") if cache_dir else None
+            cls._shared[id(renderer)] = cls(renderer.measure, scaling, cache_path=cache_path)
+        return cls._shared[id(renderer)]
+
+    def char_width(self, char: str, font: Tuple[str, int, str]) -> float:
+        """
+        获取字符宽度
+        :param char: 字符
+        :param font: 字体
+        :return: 字符宽度
+        """
+        family, size, style = font
+        key = (char, family, size, style, self.scaling)
+        width = self._widths.get(key)
+        if width is None:
+            width = self.measure(char, font)
+            self._widths[key] = width
+            self._dirty = True
+            if len(self._widths) > self.maxsize:
+                self._widths.popitem(last=False)
+        else:
+            self._widths.move_to_end(key)
+        return width
+
+    def load(self) -> None:
+        """
+        从持久化文件加载缓存，文件不存在或损坏时忽略
+        """
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("scaling") != self.scaling:
+            return
+        for char, family, size, style, width in data.get("widths", [])[-self.maxsize:]:
+            self._widths[(char, family, size, style, self.scaling)] = width
+
+    def save(self) -> None:
+        """
+        将缓存写入持久化文件
+        """
+        if not self.cache_path or not self._dirty:
+            return
+        data = {
+            "scaling": self.scaling,
+            "widths": [[char, family, size, style, width]
+                       for (char, family, size, style, _), width in self._widths.items()]
+        }
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        except OSError:
+            return
+        self._dirty = False
+
+
+# 不能出现在行首的标点
+_NO_LINE_START = set("，。、；：？！）》」』〕】”’…—·%,.;:?!)]}")
+# 不能出现在行尾的标点
+_NO_LINE_END = set("（《「『〔【“‘([{")
+
+
+def _is_word_char(char: str) -> bool:
+    """
+    判断字符是否属于不可拆分的西文单词
+    :param char: 字符
+    :return: 是否为西文单词字符
+    """
+    return char.isascii() and char.isalnum()
+
+
+class TextLayout:
+    _shared = {}
+
+    def __init__(self, metrics: FontMetrics, maxsize: int = 256) -> None:
+        """
+        初始化文本排版引擎，预先计算换行并缓存排版结果
+        :param metrics: 字体度量服务
+        :param maxsize: 排版结果缓存的最大条目数
+        """
+        self.metrics = metrics
+        self.maxsize = maxsize
+        self._lines: "OrderedDict[Tuple[str, Tuple[str, int, str], Union[int, float], float], Tuple[str, ...]]" \
+            = OrderedDict()
+
+    @classmethod
+    def for_renderer(cls, renderer: Renderer) -> "TextLayout":
+        """
+        获取渲染后端共享的排版引擎
+        :param renderer: 渲染后端
+        :return: 排版引擎
+        """
+        renderer = renderer.target or renderer
+        if id(renderer) not in cls._shared:
+            cls._shared[id(renderer)] = cls(FontMetrics.for_renderer(renderer))
+        return cls._shared[id(renderer)]
+
+    @staticmethod
+    def _units(text: str) -> List[str]:
+        """
+        将文本拆分为不可再分的排版单元：单个汉字、西文单词，并按避头尾规则粘连标点
+        :param text: 文本
+        :return: 排版单元列表
+        """
+        units = []
+        for char in text:
+            if units and char != "\n" and units[-1] != "\n" and (
+                    char in _NO_LINE_START or units[-1][-1] in _NO_LINE_END
+                    or (_is_word_char(char) and _is_word_char(units[-1][-1]))):
+                units[-1] += char
+            else:
+                units.append(char)
+        return units
+
+    def lines(self, text: str, font: Tuple[str, int, str], max_len: Union[int, float]) -> Tuple[str, ...]:
+        """
+        计算文本的换行结果
+        :param text: 文本
+        :param font: 字体
+        :param max_len: 每行最大长度
+        :return: 每一行的文本
+        """
+        key = (text, font, max_len, self.metrics.scaling)
+        lines = self._lines.get(key)
+        if lines is not None:
+            self._lines.move_to_end(key)
+            return lines
+
+        result = []
+        line, width = "", 0.0
+        for unit in self._units(text):
+            if unit == "\n":
+                result.append(line.rstrip())
+                line, width = "", 0.0
+                continue
+            unit_width = sum(self.metrics.char_width(char, font) for char in unit)
+            if line and width + unit_width > max_len:
+                result.append(line.rstrip())
+                line, width = "", 0.0
+                if unit.isspace():
+                    continue
+            if unit_width > max_len:
+                # 单元本身超长时逐字符拆分
+                for char in unit:
+                    char_width = self.metrics.char_width(char, font)
+                    if line and width + char_width > max_len:
+                        result.append(line)
+                        line, width = "", 0.0
+                    line += char
+                    width += char_width
+                continue
+            line += unit
+            width += unit_width
+        if line:
+            result.append(line.rstrip())
+
+        lines = tuple(result)
+        self._lines[key] = lines
+        if len(self._lines) > self.maxsize:
+            self._lines.popitem(last=False)
+        return lines
+
+
+class TextDisplayer:
+    def __init__(self, pen: Union[GeometryPen, StatePen], renderer: Renderer) -> None:
+        """
+        初始化文本显示类
+        :param pen: 几何画笔对象，或与renderer配套的turtle画笔状态缓存代理
+        :param renderer: 渲染后端
+        """
+        self.pen = pen
+        self.renderer = renderer
+        self.layout = TextLayout.for_renderer(renderer)
+        # 记录画笔初始状态
+        self.initial_state = {
+            "pos": pen.pos(),
+            "heading": pen.heading(),
+            "color": pen.pencolor(),
+            "pendown": pen.isdown(),
+            "visible": pen.isvisible()
+        }
+
+    def write(self, text: str, font: Tuple[str, int, str] = ("SimHei", 12, "normal"), line_height: int = 30,
+              max_len: int = 500, pencolor: Optional[Union[Tuple[int, int, int], str]] = "black") -> None:
+        """
+        输出文本并自动换行
+        :param text: 要显示的文本
+        :param font: 字体
+        :param line_height: 行高
+        :param max_len: 每行最大长度
+        :param pencolor: 文本颜色
+        """
+        self.pen.pencolor(pencolor)
+
+        start_x, start_y = self.pen.pos()
+        self.pen.hideturtle()
+        self.pen.penup()
+
+        # 每行只输出一个文本对象
+        for i, line in enumerate(self.layout.lines(text, font, max_len)):
+            if not line:
+                continue
+            self.pen.goto(start_x, start_y - i * line_height)
+            self.pen.write(line, font=font)
+        self.pen.goto(self.initial_state["pos"][0], self.initial_state["pos"][1])
+        self.pen.setheading(self.initial_state["heading"])
+        self.pen.pencolor(self.initial_state["color"])
+        if self.initial_state["pendown"]:
+            self.pen.pendown()
+        else:
+            self.pen.penup()
+        if self.initial_state["visible"]:
+            self.pen.showturtle()
+
+        self.pen.pencolor("black")
+
+        self.renderer.update()
+
+
+@dataclass(frozen=True)
+class GifFrame:
+    box: Tuple[int, int, int, int]  # 帧在逻辑画面中的(x, y, 宽, 高)
+    delay: int = 0  # 帧延时，单位为毫秒
+    disposal: int = 0  # 处置方式：0、1保留，2恢复为背景，3恢复为上一画面
+
+
+@lru_cache(maxsize=8)
+def parse_gif(data: bytes) -> Tuple[Tuple[int, int], Tuple[GifFrame, ...]]:
+    """
+    解析GIF的逻辑画面尺寸和各帧信息，不解码像素
+    :param data: GIF数据
+    :return: ((宽, 高), 各帧信息)
+    """
+    def skip_sub_blocks(i: int) -> int:
+        while data[i]:
+            i += data[i] + 1
+        return i + 1
+
+    size = (int.from_bytes(data[6:8], "little"), int.from_bytes(data[8:10], "little"))
+    i = 13
+    if data[10] & 0x80:
+        i += 3 * (2 << (data[10] & 7))
+    frames = []
+    delay = disposal = 0
+    while i < len(data) and data[i] != 0x3B:
+        if data[i] == 0x21:
+            if data[i + 1] == 0xF9:
+                disposal = data[i + 3] >> 2 & 7
+                delay = int.from_bytes(data[i + 4:i + 6], "little") * 10
+            i = skip_sub_blocks(i + 2)
+        elif data[i] == 0x2C:
+            box = tuple(int.from_bytes(data[i + 1 + 2 * k:i + 3 + 2 * k], "little") for k in range(4))
+            flags = data[i + 9]
+            i += 10
+            if flags & 0x80:
+                i += 3 * (2 << (flags & 7))
+            i = skip_sub_blocks(i + 1)
+            frames.append(GifFrame(box, delay, disposal))
+            delay = disposal = 0
+        else:
+            raise ValueError(f"unexpected GIF block 0x{data[i]:02x} at {i}")
+    return size, tuple(frames)
+
+
+class ImageCache:
+    _shared = {}
+    # 动画帧缓存的容量
+    FRAME_CACHE_SIZE = 64
+
+    def __init__(self, master: tkinter.Misc) -> None:
+        """
+        初始化图像缓存，每份图像数据只解码一次并常驻内存，动画帧放入有界缓存
+        :param master: 图像所属的Tk控件
+        """
+        self.master = master
+        self._photos = {}
+        self._frames = OrderedDict()
+
+    @classmethod
+    def for_widget(cls, master: tkinter.Misc) -> "ImageCache":
+        """
+        获取控件共享的图像缓存
+        :param master: 图像所属的Tk控件
+        :return: 图像缓存
+        """
+        if id(master) not in cls._shared:
+            cls._shared[id(master)] = cls(master)
+        return cls._shared[id(master)]
+
+    @staticmethod
+    def key(img_data: bytes) -> str:
+        """
+        计算图像数据的内容哈希
+        :param img_data: 图片数据
+        :return: 图像名
+        """
+        return "image-" + hashlib.sha256(img_data).hexdigest()[:16]
+
+    def photo(self, img_data: bytes) -> tkinter.PhotoImage:
+        """
+        获取图像对应的Tk图像，首次使用时解码
+        :param img_data: 图片数据，GIF格式
+        :return: Tk图像
+        """
+        name = self.key(img_data)
+        if name not in self._photos:
+            self._photos[name] = tkinter.PhotoImage(master=self.master,
+                                                    data=base64.b64encode(img_data).decode("ascii"))
+        return self._photos[name]
+
+    def frame(self, img_data: bytes, index: int) -> tkinter.PhotoImage:
+        """
+        获取GIF动画第index帧合成后的完整画面，按帧的处置方式叠加在上一画面上
+        :param img_data: 图片数据，GIF格式
+        :param index: 帧序号
+        :return: Tk图像
+        """
+        if index == 0:
+            return self.photo(img_data)
+        key = (self.key(img_data), index)
+        if key in self._frames:
+            self._frames.move_to_end(key)
+            return self._frames[key]
+
+        (width, height), frames = parse_gif(img_data)
+        previous = frames[index - 1]
+        if previous.disposal == 3:
+            base = self.frame(img_data, index - 2) if index >= 2 else None
+        else:
+            base = self.frame(img_data, index - 1)
+        photo = tkinter.PhotoImage(master=self.master, width=width, height=height)
+        if base is not None:
+            photo.tk.call(photo, "copy", base)
+        if previous.disposal == 2:
+            x, y, w, h = previous.box
+            photo.tk.call(photo, "copy", tkinter.PhotoImage(master=self.master, width=w, height=h),
+                          "-to", x, y, "-compositingrule", "set")
+        raw = tkinter.PhotoImage(master=self.master, data=base64.b64encode(img_data).decode("ascii"),
+                                 format=f"gif -index {index}")
+        photo.tk.call(photo, "copy", raw, "-compositingrule", "overlay")
+
+        self._frames[key] = photo
+        if len(self._frames) > self.FRAME_CACHE_SIZE:
+            self._frames.popitem(last=False)
+        return photo
+
+    def shape(self, screen: turtle.TurtleScreen, img_data: bytes) -> str:
+        """
+        获取图像对应的Turtle形状名，首次使用时注册
+        :param screen: Turtle屏幕对象
+        :param img_data: 图片数据，GIF格式
+        :return: 形状名
+        """
+        name = self.key(img_data)
+        if name not in screen.getshapes():
+            screen.register_shape(name, turtle.Shape("image", self.photo(img_data)))
+        return name
+
+
+class GifAnimation:
+    """
+    GIF动画播放：帧从ImageCache的帧缓存获取，由定时器按帧延时驱动，
+    每次只在Tk空闲时更新，并按实际经过的时间选帧，界面落后时直接跳帧而不是排队
+    """
+    # 延时过小的帧按浏览器的惯例处理
+    MIN_DELAY = 20
+    DEFAULT_DELAY = 100
+
+    def __init__(self, canvas: tkinter.Canvas, item: int, img_data: bytes, images: ImageCache) -> None:
+        """
+        初始化GIF动画
+        :param canvas: 图像对象所在的画布
+        :param item: 画布上的图像对象
+        :param img_data: 图片数据，GIF格式
+        :param images: 图像缓存
+        """
+        self.canvas = canvas
+        self.item = item
+        self.img_data = img_data
+        self.images = images
+        delays = [frame.delay if frame.delay >= self.MIN_DELAY else self.DEFAULT_DELAY
+                  for frame in parse_gif(img_data)[1]]
+        # 各帧结束时刻，单位为毫秒
+        self._ends = [sum(delays[:i + 1]) for i in range(len(delays))]
+        self.current = 0
+        self._start = 0.0
+        self._job = None
+
+    @property
+    def playing(self) -> bool:
+        return self._job is not None
+
+    def start(self) -> None:
+        """
+        开始循环播放，单帧图像不播放
+        """
+        if len(self._ends) < 2 or self.playing:
+            return
+        self._start = perf_counter() - (self._ends[self.current - 1] if self.current else 0) / 1000
+        self._schedule(self._ends[self.current] - (self._ends[self.current - 1] if self.current else 0))
+
+    def stop(self) -> None:
+        """
+        停止播放，停留在当前帧
+        """
+        if self._job is not None:
+            self.canvas.after_cancel(self._job)
+            self._job = None
+
+    def _schedule(self, delay: float) -> None:
+        def idle() -> None:
+            self._job = self.canvas.after_idle(self._tick)
+
+        self._job = self.canvas.after(max(1, int(delay)), idle)
+
+    def _tick(self) -> None:
+        if not self.canvas.find_withtag(self.item):
+            self._job = None
+            return
+        elapsed = (perf_counter() - self._start) * 1000 % self._ends[-1]
+        index = bisect.bisect_right(self._ends, elapsed)
+        if index != self.current:
+            self.canvas.itemconfigure(self.item, image=self.images.frame(self.img_data, index))
+            self.current = index
+        self._schedule(self._ends[index] - elapsed)
+
+
+class ImageDisplayer:
+    def __init__(self, renderer: Renderer) -> None:
+        """
+        初始化图像显示类
+        :param renderer: 渲染后端
+        """
+        self.renderer = renderer
+
+    def show_img(self, x: int, y: int, img_data: bytes) -> object:
+        """
+        显示Logo图片
+        :param x: 图片显示的x坐标
+        :param y: 图片显示的y坐标
+        :param img_data: 图片数据，GIF格式
+        :return: 后端相关的图形对象标识
+        """
+        return self.renderer.draw(ImageItem((x, y), img_data))
+
+
+@dataclass(frozen=True)
+class BayVariant:
+    """
+    骑楼开间样式
+    """
+    # 是否为左下角开间，需额外绘制柱子
+    extra: bool = False
+    # 是否为二层及以上，带窗户和栏杆
+    upper: bool = False
+    # 屋顶样式，None为无屋顶
+    roof: Optional[Literal["plain", "middle"]] = None
+    # 细节层次，见Qilou.LOD_FULL等
+    lod: int = 0
+    # 曲线细分精度档位，见Qilou.precision_of
+    precision: int = 0
+
+
+class Qilou:
+    # 开间宽度
+    BAY_WIDTH = 180
+    # 层高
+    FLOOR_HEIGHT = 190
+    # 开间相对左下角的包围盒
+    BAY_BOUNDS = (-20, 0, 185, 240)
+    # 细节层次：完整绘制、省略栏杆花纹和窗户拱券等细节、只绘制矩形轮廓
+    LOD_FULL, LOD_SIMPLE, LOD_BLOCK = 0, 1, 2
+    # 开间在屏幕上的宽度（像素）低于这些值时，依次降低一级细节层次
+    LOD_THRESHOLDS = (90, 36)
+    # 各开间样式的图元模板，以开间左下角为原点
+    _templates = {}
+    # 各开间样式的部件包围盒，以开间左下角为原点
+    _parts = {}
+    # 工作线程和主线程都会生成模板，生成过程持有该锁，同一样式只计算一次
+    _lock = threading.Lock()
+
+    def __init__(self, pen: Union[turtle.Turtle, GeometryPen, StatePen]) -> None:
+        """
+        初始化骑楼绘制类
+        :param pen: 画笔对象，Turtle画笔、几何画笔或状态缓存代理
+        """
+        self.pen = pen
+        self.shape = BasicShape(self.pen)
+        # 为列表时，记录几何画笔绘制的各部件的(部件名, 起始图元序号, 结束图元序号)
+        self.parts: Optional[List[Tuple[str, int, int]]] = None
+
+    @contextmanager
+    def _part(self, name: str):
+        """
+        记录with块内绘制的部件对应的图元范围
+        :param name: 部件名
+        """
+        if self.parts is None or not isinstance(self.pen, GeometryPen):
+            yield
+        else:
+            self.pen.finish()
+            start = len(self.pen.renderer.primitives)
+            yield
+            self.pen.finish()
+            self.parts.append((name, start, len(self.pen.renderer.primitives)))
+
+    def draw_window(self, left: bool = True, lod: int = 0) -> turtle.Vec2D:
+        """
+        绘制骑楼的窗户
+        :param left: 窗户是否在左侧
+        :param lod: 细节层次
+        :return: 窗户绘制起点的坐标
+        """
+        start_x, start_y = self.pen.pos()
+        top = start_y + (20 if left else 5)
+        if lod >= self.LOD_BLOCK:
+            # 窗框连同拱券合为一个矩形
+            self.pen.pensize(2)
+            self.pen.goto(start_x - 5, top + 24)
+            self.pen.setheading(0)
+            self.shape.rect((48, 72), fillcolor="#46BFC7")
+            return turtle.Vec2D(start_x, start_x)
+        self.pen.pensize(1)
+
+        self.shape.polygon(15, fillcolor="#46BFC7")
+        self.pen.goto(self.pen.xcor() + 15 * 1.5, self.pen.ycor())
+        self.shape.polygon(15, fillcolor="#46BFC7")
+        self.pen.goto(self.pen.xcor() - 15 * 1.5, self.pen.ycor() - 15 * 1.5)
+        self.shape.polygon(15, fillcolor="#46BFC7")
+        self.pen.goto(self.pen.xcor() + 15 * 1.5, self.pen.ycor())
+        self.shape.polygon(15, fillcolor="#46BFC7")
+
+        self.pen.pensize(2)
+        if left:
+            self.pen.goto(start_x - 5, start_y + 20)
+        else:
+            self.pen.goto(start_x - 5, start_y + 5)
+        self.pen.setheading(0)
+        self.shape.polygon(48)
+        if lod >= self.LOD_SIMPLE:
+            return turtle.Vec2D(start_x, start_x)
+
+        if left:
+            self.pen.goto(start_x - 5, start_y + 20)
+        else:
+            self.pen.goto(start_x - 5, start_y + 5)
+        self.pen.pendown()
+        self.pen.setheading(90)
+        self.pen.circle(-24, 180)
+        self.pen.penup()
+
+        self.pen.fillcolor("#46BFC7")
+        self.pen.begin_fill()
+        if left:
+            self.pen.goto(start_x + 6, start_y + 25)
+        else:
+            self.pen.goto(start_x + 6, start_y + 10)
+        self.pen.pendown()
+        self.pen.setheading(90)
+        self.pen.circle(-14, 180)
+        self.pen.penup()
+        if left:
+            self.pen.goto(start_x + 6, start_y + 25)
+        else:
+            self.pen.goto(start_x + 6, start_y + 10)
+        self.pen.setheading(0)
+        self.pen.pendown()
+        self.pen.forward(28)
+        self.pen.end_fill()
+        self.pen.penup()
+        self.pen.fillcolor("white")
+
+        return turtle.Vec2D(start_x, start_x)
+
+    def _single_pillar(self, extra: bool = False) -> None:
+        """
+        绘制一根骑楼的柱子
+        :param extra: 是否额外绘制
+        """
         start_x, start_y = self.pen.pos()
         self.pen.pensize(3)
 
@@ -612,13 +2160,25 @@ class Qilou:
         self.pen.setheading(90)
         self.shape.rect((60, 15))
 
-    def draw_pillars(self, extra: bool = False) -> turtle.Vec2D:
+    def draw_pillars(self, extra: bool = False, lod: int = 0) -> turtle.Vec2D:
         """
         绘制骑楼的柱子
         :param extra: 是否需要额外绘制
+        :param lod: 细节层次
         :return: 柱子绘制起点的坐标
         """
         start_x, start_y = self.pen.pos()
+        if lod >= self.LOD_BLOCK:
+            # 上下柱合为一个矩形，省略小柱和拱
+            self.pen.pensize(3)
+            for x in (start_x - 15, start_x + 165):
+                self.pen.goto(x, start_y)
+                self.pen.setheading(90)
+                self.shape.rect((190, 15))
+            self.pen.goto(start_x, start_y + 120 + 10 + 60)
+            self.shape.Line(165)
+            self.pen.penup()
+            return turtle.Vec2D(start_x, start_y)
         if extra:
             self._single_pillar(extra=True)
         else:
@@ -647,180 +2207,1324 @@ class Qilou:
         self.pen.circle(10, 180)
         self.pen.penup()
 
-        self.pen.goto(start_x + 20, start_y)
-        self.pen.pendown()
-        self.pen.circle(-10, 180)
-        self.pen.setheading(180)
-        self.pen.circle(-10, 180)
-        self.pen.penup()
+        self.pen.goto(start_x + 20, start_y)
+        self.pen.pendown()
+        self.pen.circle(-10, 180)
+        self.pen.setheading(180)
+        self.pen.circle(-10, 180)
+        self.pen.penup()
+
+        self.pen.goto(start_x + 20, start_y)
+        self.pen.setheading(90)
+        self.pen.pendown()
+        self.pen.forward(40)
+        self.pen.penup()
+
+        self.pen.goto(self.pen.xcor() - 10, self.pen.ycor() - 10)
+        self.pen.setheading(0)
+        self.pen.backward(5)
+        self.pen.pendown()
+        self.pen.forward(10)
+        self.pen.penup()
+        self.pen.goto(self.pen.xcor() - 5, self.pen.ycor() - 20)
+        self.pen.setheading(0)
+        self.pen.backward(5)
+        self.pen.pendown()
+        self.pen.forward(10)
+        self.pen.penup()
+
+        self.pen.goto(start_x + 20, start_y)
+
+    def draw_railing(self, lod: int = 0) -> None:
+        """
+        绘制骑楼的栏杆
+        :param lod: 细节层次，低于完整细节时省略栏杆图案
+        """
+        start_x, start_y = self.pen.pos()
+        self.pen.pensize(3)
+        self.pen.pendown()
+        self.pen.forward(165)
+        self.pen.penup()
+        self.pen.goto(start_x, start_y + 40)
+        self.pen.pendown()
+        self.pen.forward(165)
+        self.pen.penup()
+        self.pen.pensize(1)
+        self.pen.goto(start_x, start_y)
+        if lod == self.LOD_FULL:
+            for _ in range(8):
+                self._railing_pattern()
+        self.pen.goto(start_x - 15, start_y)
+
+    def draw_roof(self, middle: bool = False, lod: int = 0) -> None:
+        """
+        绘制骑楼的屋顶
+        :param middle: 是否为中间的屋顶
+        :param lod: 细节层次
+        """
+        start_x, start_y = self.pen.pos()
+        self.pen.pensize(3)
+        if lod >= self.LOD_BLOCK:
+            # 整个屋顶合为一个矩形，中间的屋顶以红色填充代替牌匾
+            self.pen.setheading(0)
+            self.shape.rect((195, 50), fillcolor="red" if middle else None)
+            self.pen.goto(start_x + 15, start_y - 10)
+            return
+
+        self.shape.rect((15, 50))
+        self.pen.goto(start_x + 180, start_y)
+        self.shape.rect((15, 50))
+        self.pen.goto(start_x + 15, start_y - 10)
+        self.shape.Line(165, 0)
+        border_x = self.pen.xcor()
+        self.pen.goto(self.pen.xcor(), self.pen.ycor() - 40)
+        self.shape.Line(165, 180)
+
+        if middle:
+            self.pen.goto(self.pen.xcor() + 5, self.pen.ycor() + 5)
+            self.pen.setheading(90)
+            self.shape.rect((30, 155), fillcolor="red")
+            self.pen.goto(self.pen.xcor() + 82.5, self.pen.ycor())
+            self.pen.write("岭南骑楼", font=("LiSu", 12, "normal"), align="center")
+            self.pen.goto(start_x + 15, start_y - 10)
+        elif lod == self.LOD_FULL:
+            self.pen.pensize(1)
+            self.pen.setheading(0)
+            self.pen.pendown()
+            while self.pen.xcor() <= border_x:
+                self.pen.setheading(80)
+                self.pen.forward(40)
+                self.pen.setheading(-80)
+                self.pen.forward(40)
+            self.pen.penup()
+            self.pen.goto(start_x + 15, start_y - 10)
+            self.pen.setheading(0)
+            self.pen.pendown()
+            while self.pen.xcor() <= border_x:
+                self.pen.setheading(-80)
+                self.pen.forward(40)
+                self.pen.setheading(80)
+                self.pen.forward(40)
+            self.pen.penup()
+
+    def draw_bay(self, variant: "BayVariant") -> None:
+        """
+        绘制骑楼的一个开间，画笔位于开间左下角
+        :param variant: 开间样式
+        """
+        with self._part("pillars"):
+            pillars_start = self.draw_pillars(extra=variant.extra, lod=variant.lod)
+        if variant.upper:
+            self.pen.goto(pillars_start[0] + 25, pillars_start[1] + 100)
+            with self._part("window"):
+                self.draw_window(left=True, lod=variant.lod)
+            self.pen.goto(pillars_start[0] + 95, pillars_start[1] + 115)
+            with self._part("window"):
+                self.draw_window(left=False, lod=variant.lod)
+            self.pen.goto(pillars_start[0], pillars_start[1])
+            with self._part("railing"):
+                self.draw_railing(lod=variant.lod)
+        if variant.roof:
+            self.pen.goto(pillars_start[0] - 15, pillars_start[1] + 240)
+            with self._part("roof"):
+                self.draw_roof(middle=variant.roof == "middle", lod=variant.lod)
+        self.pen.goto(pillars_start[0], pillars_start[1] + self.FLOOR_HEIGHT)
+
+    @classmethod
+    def level_of_detail(cls, bay_pixels: float) -> int:
+        """
+        按开间在屏幕上的宽度选择细节层次
+        :param bay_pixels: 开间在屏幕上的宽度，单位为像素
+        :return: 细节层次
+        """
+        return sum(bay_pixels < threshold for threshold in cls.LOD_THRESHOLDS)
+
+    @staticmethod
+    def precision_of(pixel_size: float) -> int:
+        """
+        将渲染后端的像素大小量化为曲线细分精度档位，每半个倍频程一档，向精细的一侧取整
+        :param pixel_size: 一个屏幕像素对应的世界坐标长度
+        :return: 精度档位
+        """
+        return math.floor(math.log2(pixel_size) * 2 + 1e-9)
+
+    @staticmethod
+    def bay_variant(c: int, f: int, column: int, floor: int, lod: int = 0, precision: int = 0) -> "BayVariant":
+        """
+        计算某一开间的样式
+        :param c: 开间所在列
+        :param f: 开间所在层
+        :param column: 骑楼的列数
+        :param floor: 骑楼的层数
+        :param lod: 细节层次
+        :param precision: 曲线细分精度档位
+        :return: 开间样式
+        """
+        roof = None
+        if f == floor - 1:
+            roof = "middle" if c == column // 2 else "plain"
+        return BayVariant(extra=c == 0 and f == 0, upper=f != 0, roof=roof, lod=lod, precision=precision)
+
+    @classmethod
+    def bay_template(cls, variant: "BayVariant") -> Tuple[Primitive, ...]:
+        """
+        获取开间样式的图元模板，每种样式只计算并合并一次，可在多个线程中调用
+        :param variant: 开间样式
+        :return: 以开间左下角为原点的图元
+        """
+        template = cls._templates.get(variant)
+        if template is not None:
+            return template
+        with cls._lock:
+            if variant not in cls._templates:
+                renderer = RecordingRenderer()
+                # 按精度档位对应的像素大小细分曲线，同一档内的缩放比例共用模板
+                renderer.pixel_size = 2 ** (variant.precision / 2)
+                pen = GeometryPen(renderer)
+                pen.penup()
+                qilou = cls(pen)
+                qilou.parts = []
+                qilou.draw_bay(variant)
+                pen.finish()
+                primitives = tuple(pen.renderer.primitives)
+                # 先登记部件再登记模板，不加锁读到模板的线程一定也能读到部件
+                cls._parts[variant] = tuple((name, _primitives_bbox(primitives[start:end]))
+                                            for name, start, end in qilou.parts)
+                cls._templates[variant] = tuple(coalesce(primitives))
+            return cls._templates[variant]
+
+    @classmethod
+    def bay_parts(cls, variant: "BayVariant") -> Tuple[Tuple[str, Tuple[float, float, float, float]], ...]:
+        """
+        获取开间样式中各部件（柱子、窗户、栏杆、屋顶）的包围盒
+        :param variant: 开间样式
+        :return: (部件名, 以开间左下角为原点的包围盒)
+        """
+        cls.bay_template(variant)
+        return cls._parts[variant]
+
+    def compile_bay(self, variant: "BayVariant",
+                    origin: Tuple[Union[int, float], Union[int, float]] = (0, 0)) -> List[Primitive]:
+        """
+        将一个开间编译为图元列表，由模板平移得到
+        :param variant: 开间样式
+        :param origin: 开间左下角坐标
+        :return: 图元列表
+        """
+        return [prim.translated(origin[0], origin[1]) for prim in self.bay_template(variant)]
+
+    def compile(self, column: int = 3, floor: int = 2,
+                origin: Optional[Tuple[Union[int, float], Union[int, float]]] = None,
+                lod: int = 0, pixel_size: Optional[float] = None) -> List[Primitive]:
+        """
+        将骑楼编译为图元列表，不操作turtle
+        :param column: 骑楼的列数
+        :param floor: 骑楼的层数
+        :param origin: 骑楼起点坐标，默认为当前画笔位置
+        :param lod: 细节层次
+        :param pixel_size: 目标后端的像素大小，决定曲线细分精度，默认取几何画笔的后端
+        :return: 图元列表
+        """
+        start_x, start_y = self.pen.pos() if origin is None else origin
+        if pixel_size is None:
+            pixel_size = self.pen.renderer.pixel_size if isinstance(self.pen, GeometryPen) else 1.0
+        precision = self.precision_of(pixel_size)
+        primitives = []
+        for c in range(column):
+            for f in range(floor):
+                primitives.extend(self.compile_bay(self.bay_variant(c, f, column, floor, lod, precision),
+                                                   (start_x + c * self.BAY_WIDTH, start_y + f * self.FLOOR_HEIGHT)))
+        return primitives
+
+    def draw(self, column: int = 3, floor: int = 2, retained: bool = False, lod: int = 0) -> None:
+        """
+        绘制骑楼
+        :param column: 骑楼的列数
+        :param floor: 骑楼的层数
+        :param retained: 对Turtle画笔，是否先编译为图元再一次性输出到画布；几何画笔总是如此
+        :param lod: 细节层次
+        """
+        start_x, start_y = self.pen.pos()
+        if retained or isinstance(self.pen, GeometryPen):
+            if isinstance(self.pen, GeometryPen):
+                renderer = self.pen.renderer
+            else:
+                renderer = CanvasRenderer.for_screen(self.pen.getscreen())
+            renderer.draw_all(self.compile(column, floor, lod=lod, pixel_size=renderer.pixel_size))
+            self.pen.penup()
+            self.pen.goto(start_x + column * self.BAY_WIDTH, start_y)
+            return
+        for c in range(column):
+            for f in range(floor):
+                self.pen.goto(start_x + c * self.BAY_WIDTH, start_y + f * self.FLOOR_HEIGHT)
+                self.draw_bay(self.bay_variant(c, f, column, floor, lod))
+            self.pen.goto(start_x + (c + 1) * self.BAY_WIDTH, start_y)
+
+
+class SpatialIndex:
+    """
+    均匀网格空间索引：按包围盒登记对象，按点查询，单次操作的耗时只与对象大小有关，与对象总数无关
+    """
+
+    def __init__(self, cell_size: float) -> None:
+        """
+        初始化空间索引
+        :param cell_size: 网格边长，取与常见对象尺寸相当的值
+        """
+        self.cell_size = cell_size
+        self._cells = {}
+        self._boxes = {}
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def _cells_of(self, bbox: Tuple[float, float, float, float]) -> Iterable[Tuple[int, int]]:
+        x0, y0, x1, y1 = bbox
+        size = self.cell_size
+        return ((i, j) for i in range(math.floor(x0 / size), math.floor(x1 / size) + 1)
+                for j in range(math.floor(y0 / size), math.floor(y1 / size) + 1))
+
+    def insert(self, key: object, bbox: Tuple[float, float, float, float]) -> None:
+        """
+        登记对象，已登记的对象会被替换
+        :param key: 对象标识，须可哈希
+        :param bbox: 包围盒(x0, y0, x1, y1)
+        """
+        self.remove(key)
+        self._boxes[key] = bbox
+        for cell in self._cells_of(bbox):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key: object) -> None:
+        """
+        移除对象，未登记时忽略
+        :param key: 对象标识
+        """
+        bbox = self._boxes.pop(key, None)
+        if bbox is None:
+            return
+        for cell in self._cells_of(bbox):
+            keys = self._cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self._cells[cell]
+
+    def query(self, x: float, y: float) -> List[object]:
+        """
+        查询包含指定点的对象
+        :param x: x坐标
+        :param y: y坐标
+        :return: 对象标识列表，按包围盒面积从小到大排列
+        """
+        cell = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        hits = [key for key in self._cells.get(cell, ())
+                if self._boxes[key][0] <= x <= self._boxes[key][2] and self._boxes[key][1] <= y <= self._boxes[key][3]]
+        return sorted(hits, key=lambda key: (self._boxes[key][2] - self._boxes[key][0]) *
+                                            (self._boxes[key][3] - self._boxes[key][1]))
+
+    def bbox(self, key: object) -> Tuple[float, float, float, float]:
+        """
+        获取已登记对象的包围盒
+        :param key: 对象标识
+        :return: 包围盒(x0, y0, x1, y1)
+        """
+        return self._boxes[key]
+
+
+class GeometryWorker:
+    """
+    后台几何计算线程：在工作线程中计算开间图元，通过线程安全的队列交给Tk主线程绘制
+    """
+
+    def __init__(self) -> None:
+        """
+        初始化并启动工作线程
+        """
+        self.results = queue.Queue()
+        self._requests = queue.Queue()
+        self._generation = 0
+        self._qilou = Qilou(GeometryPen())
+        self._thread = threading.Thread(target=self._run, name="qilou-geometry", daemon=True)
+        self._thread.start()
+
+    @property
+    def generation(self) -> int:
+        """
+        当前任务批次，结果队列中批次不同的结果已经过期
+        """
+        return self._generation
+
+    def submit(self, jobs: List[Tuple[Tuple[int, int], "BayVariant", Point]]) -> int:
+        """
+        提交一批开间，之前未完成的批次作废
+        :param jobs: (开间位置, 开间样式, 开间左下角坐标)列表，按计算顺序排列
+        :return: 本批次编号
+        """
+        self._generation += 1
+        self._requests.put((self._generation, jobs))
+        return self._generation
+
+    def cancel(self) -> None:
+        """
+        作废尚未完成的批次
+        """
+        self._generation += 1
+
+    def _run(self) -> None:
+        while True:
+            generation, jobs = self._requests.get()
+            for bay, variant, origin in jobs:
+                if generation != self._generation:
+                    break
+                self.results.put((generation, bay, variant, self._qilou.compile_bay(variant, origin)))
 
-        self.pen.goto(start_x + 20, start_y)
-        self.pen.setheading(90)
-        self.pen.pendown()
-        self.pen.forward(40)
-        self.pen.penup()
 
-        self.pen.goto(self.pen.xcor() - 10, self.pen.ycor() - 10)
-        self.pen.setheading(0)
-        self.pen.backward(5)
-        self.pen.pendown()
-        self.pen.forward(10)
-        self.pen.penup()
-        self.pen.goto(self.pen.xcor() - 5, self.pen.ycor() - 20)
-        self.pen.setheading(0)
-        self.pen.backward(5)
-        self.pen.pendown()
-        self.pen.forward(10)
-        self.pen.penup()
+class QilouView:
+    # 每帧用于绘制开间的时间预算，单位为秒，超出后让出事件循环
+    FRAME_BUDGET = 0.012
 
-        self.pen.goto(start_x + 20, start_y)
+    def __init__(self, screen: turtle.TurtleScreen, origin: Tuple[Union[int, float], Union[int, float]],
+                 margin: Union[int, float] = 200,
+                 renderer: Optional[Union["CanvasRenderer", "TurtleRenderer"]] = None) -> None:
+        """
+        初始化可滚动的骑楼视图，只绘制与可见区域相交的开间
+        :param screen: Turtle屏幕对象
+        :param origin: 骑楼起点坐标
+        :param margin: 可见区域外额外绘制的边距
+        :param renderer: 绘制到该屏幕画布上的渲染后端，默认为画布后端
+        """
+        self.screen = screen
+        self.origin = origin
+        self.margin = margin
+        self.renderer = renderer or CanvasRenderer.for_screen(screen)
+        self.worker = GeometryWorker()
+        # 已绘制开间及其部件的空间索引，键为(列, 层, 部件名, 部件序号)
+        self.index = SpatialIndex(Qilou.BAY_WIDTH)
+        self.column = self.floor = 0
+        # 已绘制的开间 -> (开间样式, 画布对象)
+        self.bays = {}
+        self._default_size = screen.screensize()
+        # 已安排的空闲刷新，同一轮事件中的多次视图变化只刷新一次
+        self._refresh_job = None
+        # 已提交给工作线程、尚未绘制的开间
+        self._pending = set()
+        self._generation = 0
+        self._job = None
+
+        cv = screen.getcanvas()
+        # turtle的ScrolledCanvas把真正的Tk画布放在_canvas中
+        self._canvas = getattr(cv, "_canvas", cv)
+        hscroll, vscroll = getattr(cv, "hscroll", None), getattr(cv, "vscroll", None)
+
+        def on_xscroll(first: str, last: str) -> None:
+            if hscroll is not None:
+                hscroll.set(first, last)
+            self.schedule_refresh()
+
+        def on_yscroll(first: str, last: str) -> None:
+            if vscroll is not None:
+                vscroll.set(first, last)
+            self.schedule_refresh()
+
+        self._canvas.configure(xscrollcommand=on_xscroll, yscrollcommand=on_yscroll)
+        # 哨兵对象标记骑楼图层在叠放次序中的位置，新开间逐个放到它的正下方，不必每帧重排整个画布；
+        # 叠放次序自下而上为背景图层、骑楼、哨兵、其余图层
+        self._sentinel = self._canvas.create_line(0, 0, 0, 0, state=tkinter.HIDDEN)
+        self._canvas.tag_lower(self._sentinel)
+        self.renderer.lower_layer(Layer.BACKGROUND)
+
+    def bay_origin(self, c: int, f: int) -> Point:
+        """
+        计算开间左下角坐标
+        :param c: 开间所在列
+        :param f: 开间所在层
+        :return: 开间左下角坐标
+        """
+        return self.origin[0] + c * Qilou.BAY_WIDTH, self.origin[1] + f * Qilou.FLOOR_HEIGHT
 
-    def draw_railing(self) -> None:
+    def bay_bbox(self, c: int, f: int) -> Tuple[float, float, float, float]:
         """
-        绘制骑楼的栏杆
+        计算开间的包围盒
+        :param c: 开间所在列
+        :param f: 开间所在层
+        :return: 包围盒(x0, y0, x1, y1)
         """
-        start_x, start_y = self.pen.pos()
-        self.pen.pensize(3)
-        self.pen.pendown()
-        self.pen.forward(165)
-        self.pen.penup()
-        self.pen.goto(start_x, start_y + 40)
-        self.pen.pendown()
-        self.pen.forward(165)
-        self.pen.penup()
-        self.pen.pensize(1)
-        self.pen.goto(start_x, start_y)
-        for _ in range(8):
-            self._railing_pattern()
-        self.pen.goto(start_x - 15, start_y)
+        x, y = self.bay_origin(c, f)
+        x0, y0, x1, y1 = Qilou.BAY_BOUNDS
+        return x + x0, y + y0, x + x1, y + y1
 
-    def draw_roof(self, middle: bool = False) -> None:
+    def _bay_boxes(self, c: int, f: int, variant: BayVariant) -> Iterable[
+            Tuple[Tuple[int, int, str, int], Tuple[float, float, float, float]]]:
         """
-        绘制骑楼的屋顶
-        :param middle: 是否为中间的屋顶
+        计算开间及其部件在索引中的键和包围盒
+        :param c: 开间所在列
+        :param f: 开间所在层
+        :param variant: 开间样式
+        :return: (键, 包围盒)
         """
-        start_x, start_y = self.pen.pos()
-        self.pen.pensize(3)
+        yield (c, f, "bay", 0), self.bay_bbox(c, f)
+        x, y = self.bay_origin(c, f)
+        for i, (name, (x0, y0, x1, y1)) in enumerate(Qilou.bay_parts(variant)):
+            yield (c, f, name, i), (x + x0, y + y0, x + x1, y + y1)
 
-        self.shape.rect((15, 50))
-        self.pen.goto(start_x + 180, start_y)
-        self.shape.rect((15, 50))
-        self.pen.goto(start_x + 15, start_y - 10)
-        self.shape.Line(165, 0)
-        border_x = self.pen.xcor()
-        self.pen.goto(self.pen.xcor(), self.pen.ycor() - 40)
-        self.shape.Line(165, 180)
+    def hit_test(self, x: float, y: float) -> Optional[Tuple[int, int, str, int]]:
+        """
+        查找点击位置上已绘制的开间部件，部件重叠时取最小的
+        :param x: 点击位置的x坐标
+        :param y: 点击位置的y坐标
+        :return: (列, 层, 部件名, 部件序号)，部件名为"bay"表示开间中没有部件的空白处；未点中骑楼时为None
+        """
+        hits = self.index.query(x, y)
+        return hits[0] if hits else None
 
-        if middle:
-            self.pen.goto(self.pen.xcor() + 5, self.pen.ycor() + 5)
-            self.pen.setheading(90)
-            self.shape.rect((30, 155), fillcolor="red")
-            self.pen.goto(self.pen.xcor() + 82.5, self.pen.ycor())
-            self.pen.write("岭南骑楼", font=("LiSu", 12, "normal"), align="center")
-            self.pen.goto(start_x + 15, start_y - 10)
-        else:
-            self.pen.pensize(1)
-            self.pen.setheading(0)
-            self.pen.pendown()
-            while self.pen.xcor() <= border_x:
-                self.pen.setheading(80)
-                self.pen.forward(40)
-                self.pen.setheading(-80)
-                self.pen.forward(40)
-            self.pen.penup()
-            self.pen.goto(start_x + 15, start_y - 10)
-            self.pen.setheading(0)
-            self.pen.pendown()
-            while self.pen.xcor() <= border_x:
-                self.pen.setheading(-80)
-                self.pen.forward(40)
-                self.pen.setheading(80)
-                self.pen.forward(40)
-            self.pen.penup()
+    def viewport(self) -> Tuple[float, float, float, float]:
+        """
+        获取当前可见区域的世界坐标
+        :return: 可见区域(x0, y0, x1, y1)
+        """
+        canvas = self._canvas
+        xscale, yscale = self.screen.xscale, self.screen.yscale
+        x0, x1 = canvas.canvasx(0), canvas.canvasx(canvas.winfo_width())
+        y0, y1 = canvas.canvasy(0), canvas.canvasy(canvas.winfo_height())
+        return x0 / xscale, -y1 / yscale, x1 / xscale, -y0 / yscale
+
+    @property
+    def lod(self) -> int:
+        """
+        按开间在屏幕上的宽度选择的细节层次，画布缩放后随之变化
+        """
+        return Qilou.level_of_detail(Qilou.BAY_WIDTH * abs(self.screen.xscale))
 
-    def draw(self, column: int = 3, floor: int = 2) -> None:
+    def visible_bays(self) -> Iterable[Tuple[int, int]]:
         """
-        绘制骑楼
+        计算与可见区域（含边距）相交的开间
+        :return: 开间的(列, 层)
+        """
+        vx0, vy0, vx1, vy1 = self.viewport()
+        bx0, by0, bx1, by1 = Qilou.BAY_BOUNDS
+        ox, oy = self.origin
+        c0 = max(0, math.floor((vx0 - self.margin - ox - bx1) / Qilou.BAY_WIDTH) + 1)
+        c1 = min(self.column - 1, math.floor((vx1 + self.margin - ox - bx0) / Qilou.BAY_WIDTH))
+        f0 = max(0, math.floor((vy0 - self.margin - oy - by1) / Qilou.FLOOR_HEIGHT) + 1)
+        f1 = min(self.floor - 1, math.floor((vy1 + self.margin - oy - by0) / Qilou.FLOOR_HEIGHT))
+        return ((c, f) for c in range(c0, c1 + 1) for f in range(f0, f1 + 1))
+
+    def show(self, column: int, floor: int) -> None:
+        """
+        显示指定规模的骑楼，并按建筑大小调整画布滚动范围。
+        已绘制且样式未变的开间保持不动，只增删或重绘有变化的开间
         :param column: 骑楼的列数
         :param floor: 骑楼的层数
         """
-        start_x, start_y = self.pen.pos()
-        for c in range(column):
-            for f in range(floor):
-                if c == 0 and f == 0:
-                    pillars_start = self.draw_pillars(extra=True)
-                else:
-                    pillars_start = self.draw_pillars()
-                if f != 0:
-                    self.pen.goto(pillars_start[0] + 25, pillars_start[1] + 100)
-                    self.draw_window(left=True)
-                    self.pen.goto(pillars_start[0] + 95, pillars_start[1] + 115)
-                    self.draw_window(left=False)
-                    self.pen.goto(pillars_start[0], pillars_start[1])
-                    self.draw_railing()
-                if f == floor - 1:
-                    self.pen.goto(pillars_start[0] - 15, pillars_start[1] + 240)
-                    if c == column // 2:
-                        self.draw_roof(middle=True)
-                    else:
-                        self.draw_roof()
-                self.pen.goto(pillars_start[0], pillars_start[1] + 190)
-            self.pen.goto(start_x + (c + 1) * 180, start_y)
+        self.column, self.floor = column, floor
+
+        x0, y0, _, _ = self.bay_bbox(0, 0)
+        _, _, x1, y1 = self.bay_bbox(column - 1, floor - 1)
+        width = 2 * (max(abs(x0), abs(x1)) + self.margin) * self.screen.xscale
+        height = 2 * (max(abs(y0), abs(y1)) + self.margin) * self.screen.yscale
+        size = (max(int(width), self._default_size[0]), max(int(height), self._default_size[1]))
+        if size != self.screen.screensize():
+            self.screen.screensize(*size)
+        # 调整滚动范围会触发滚动回调，与之合并为一次刷新
+        self.schedule_refresh()
+
+    def schedule_refresh(self) -> None:
+        """
+        可见区域或缩放比例变化后，在空闲时刷新一次
+        """
+        if self._refresh_job is None:
+            self._refresh_job = self._canvas.after_idle(self.refresh)
+
+    def refresh(self) -> None:
+        """
+        删除离开可见区域、细节层次或细分精度已变的开间，由工作线程计算进入可见区域的开间，离可见区域中心近的先计算，
+        主线程分帧绘制计算好的开间。新的刷新会取消尚未完成的计算和绘制
+        """
+        if self._refresh_job is not None:
+            self._canvas.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        self.cancel()
+        lod, precision = self.lod, Qilou.precision_of(self.renderer.pixel_size)
+        visible = {(c, f): Qilou.bay_variant(c, f, self.column, self.floor, lod, precision)
+                   for c, f in self.visible_bays()}
+        for bay in [bay for bay, (variant, _) in self.bays.items() if visible.get(bay) != variant]:
+            variant, items = self.bays.pop(bay)
+            self.renderer.delete(items)
+            for key, _ in self._bay_boxes(*bay, variant):
+                self.index.remove(key)
+
+        vx0, vy0, vx1, vy1 = self.viewport()
+        cx, cy = (vx0 + vx1) / 2, (vy0 + vy1) / 2
+
+        def distance(item: Tuple[Tuple[int, int], BayVariant]) -> float:
+            bx0, by0, bx1, by1 = self.bay_bbox(*item[0])
+            return math.hypot((bx0 + bx1) / 2 - cx, (by0 + by1) / 2 - cy)
+
+        missing = sorted(((bay, variant) for bay, variant in visible.items() if bay not in self.bays), key=distance)
+        if not missing:
+            return
+        self._pending = {bay for bay, _ in missing}
+        self._generation = self.worker.submit([(bay, variant, self.bay_origin(*bay)) for bay, variant in missing])
+        self._job = self._canvas.after(1, self._draw_chunk)
+
+    def _draw_chunk(self) -> None:
+        """
+        在一帧的时间预算内绘制工作线程已计算好的开间，其余的留到下一帧
+        """
+        self._job = None
+        deadline = perf_counter() + self.FRAME_BUDGET
+        drawn = False
+        while self._pending and perf_counter() < deadline:
+            try:
+                generation, bay, variant, prims = self.worker.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self._generation:
+                continue
+            with self.renderer.layer(Layer.BUILDING):
+                items = [self.renderer.draw(prim) for prim in prims]
+            for item in items:
+                # 画布后端返回单个对象编号，turtle后端返回一组编号
+                for canvas_item in item if isinstance(item, tuple) else (item,):
+                    self._canvas.tag_lower(canvas_item, self._sentinel)
+            self.bays[bay] = (variant, items)
+            for key, bbox in self._bay_boxes(*bay, variant):
+                self.index.insert(key, bbox)
+            self._pending.discard(bay)
+            drawn = True
+        if drawn:
+            self.renderer.update()
+        if self._pending:
+            self._job = self._canvas.after(1, self._draw_chunk)
+
+    def cancel(self) -> None:
+        """
+        取消尚未完成的计算和分帧绘制，已绘制的开间保留
+        """
+        if self._job is not None:
+            self._canvas.after_cancel(self._job)
+            self._job = None
+        if self._pending:
+            self.worker.cancel()
+            self._pending = set()
+
+    @property
+    def busy(self) -> bool:
+        """
+        是否仍有开间等待绘制，包括尚未执行的刷新
+        """
+        return bool(self._pending) or self._refresh_job is not None
+
+
+class ViewNavigator:
+    """
+    滚轮缩放和拖动平移：对画布上已有的对象做仿射变换而不重绘，
+    缩放后骑楼视图只重绘细节层次变化或新进入可见区域的开间
+    """
+    # 滚轮每格的缩放倍数
+    ZOOM_STEP = 1.25
+    # 相对初始比例的缩放范围
+    MIN_ZOOM, MAX_ZOOM = 0.1, 4.0
+
+    def __init__(self, screen: turtle.TurtleScreen, view: Optional[QilouView] = None) -> None:
+        """
+        初始化视图导航，绑定滚轮缩放、中键或右键拖动平移和窗口大小变化
+        :param screen: Turtle屏幕对象
+        :param view: 骑楼视图，可见区域或缩放比例变化后刷新
+        """
+        self.screen = screen
+        self.view = view
+        self.renderer = view.renderer if view is not None else CanvasRenderer.for_screen(screen)
+        cv = screen.getcanvas()
+        self._canvas = getattr(cv, "_canvas", cv)
+        # 同一帧内累积的滚轮缩放，空闲时一次应用
+        self._factor = 1.0
+        self._anchor = (0, 0)
+        self._job = None
+
+        canvas = self._canvas
+        canvas.bind("<MouseWheel>", self._on_wheel)
+        canvas.bind("<Button-4>", self._on_wheel)
+        canvas.bind("<Button-5>", self._on_wheel)
+        for button in (2, 3):
+            canvas.bind(f"<ButtonPress-{button}>", self._on_press)
+            canvas.bind(f"<B{button}-Motion>", self._on_drag)
+        canvas.bind("<Configure>", self._on_resize, add="+")
+
+    @property
+    def zoom(self) -> float:
+        """
+        相对初始比例的缩放倍数
+        """
+        return self.renderer.zoom
+
+    def zoom_at(self, factor: float, x: float, y: float) -> None:
+        """
+        以窗口中的一点为中心缩放，该点下的内容保持不动
+        :param factor: 缩放倍数，超出缩放范围的部分被截去
+        :param x: 缩放中心在窗口中的x坐标
+        :param y: 缩放中心在窗口中的y坐标
+        """
+        factor = min(max(self.zoom * factor, self.MIN_ZOOM), self.MAX_ZOOM) / self.zoom
+        if abs(factor - 1) < 1e-9:
+            return
+        canvas = self._canvas
+        cx, cy = canvas.canvasx(x), canvas.canvasy(y)
+        self.renderer.rescale(factor)
+        # turtle按屏幕比例换算点击坐标和画笔坐标
+        self.screen.xscale *= factor
+        self.screen.yscale *= factor
+
+        width, height = self.screen.screensize()
+        self.screen.screensize(max(int(width * factor), canvas.winfo_width()),
+                               max(int(height * factor), canvas.winfo_height()))
+        x0, y0, x1, y1 = (float(value) for value in canvas.cget("scrollregion").split())
+        canvas.xview_moveto((cx * factor - x - x0) / (x1 - x0))
+        canvas.yview_moveto((cy * factor - y - y0) / (y1 - y0))
+        if self.view is not None:
+            self.view.schedule_refresh()
+
+    def _on_wheel(self, event: tkinter.Event) -> None:
+        zoom_in = event.num == 4 or getattr(event, "delta", 0) > 0
+        self._factor *= self.ZOOM_STEP if zoom_in else 1 / self.ZOOM_STEP
+        self._anchor = (event.x, event.y)
+        if self._job is None:
+            self._job = self._canvas.after_idle(self._apply_zoom)
+
+    def _apply_zoom(self) -> None:
+        self._job = None
+        factor, self._factor = self._factor, 1.0
+        self.zoom_at(factor, *self._anchor)
+
+    def _on_press(self, event: tkinter.Event) -> None:
+        self._canvas.scan_mark(event.x, event.y)
+
+    def _on_drag(self, event: tkinter.Event) -> None:
+        # 视图移动触发滚动回调，骑楼视图随之在空闲时刷新
+        self._canvas.scan_dragto(event.x, event.y, gain=1)
+
+    def _on_resize(self, event: tkinter.Event) -> None:
+        # 几何不变，只需按新的可见区域增删开间
+        if self.view is not None:
+            self.view.schedule_refresh()
+
+
+def _write_text(displayer: "TextDisplayer", spec: dict) -> None:
+    """
+    按文本描述在画笔当前位置写字，描述的格式与场景文件中的文本组件相同
+    :param displayer: 文本显示器
+    :param spec: 文本描述，含"constant"或"text"、"font"，可选"max_len"、"line_height"、"pencolor"
+    """
+    kwargs = {key: spec[key] for key in ("max_len", "line_height", "pencolor") if key in spec}
+    displayer.write(Scene.text_of(spec), font=tuple(spec["font"]), **kwargs)
 
 
 class LionDance:
-    def __init__(self, pen: turtle.Turtle, screen: turtle.Screen()) -> None:
+    # 默认的介绍文字，场景文件中的"desc"覆盖此设置
+    DESC = {"constant": "LIONDANCE_DESC", "font": ("SimHei", 11, "normal"), "max_len": 500, "line_height": 35}
+
+    def __init__(self, pen: GeometryPen, renderer: Renderer) -> None:
         """
         初始化舞狮绘制类
-        :param pen: Turtle画笔对象
-        :param screen: Turtle屏幕对象
+        :param pen: 几何画笔对象
+        :param renderer: 渲染后端
         """
         self.pen = pen
-        self.screen = screen
+        self.renderer = renderer
 
-        self.img = ImageDisplayer(self.screen)
-        self.text = TextDisplayer(self.pen, self.screen)
+        self.img = ImageDisplayer(self.renderer)
+        self.text = TextDisplayer(self.pen, self.renderer)
+        self.animation: Optional[GifAnimation] = None
 
     def draw(self, pos_img: Tuple[Union[int, float], Union[int, float]],
-             pos_desc: Tuple[Union[int, float], Union[int, float]]) -> None:
+             pos_desc: Tuple[Union[int, float], Union[int, float]],
+             desc: Optional[dict] = None, asset: str = "liondance") -> None:
         """
         绘制舞狮
         :param pos_img: 图像位置
         :param pos_desc: 文本位置
+        :param desc: 介绍文字的文本描述，默认为DESC
+        :param asset: 图片资源名
         """
-        self.img.show_img(pos_img[0], pos_img[1], Constants.LIONDANCE_BASE64)
+        img_data = ASSETS.get(asset)
+        item = self.img.show_img(pos_img[0], pos_img[1], img_data)
+        if isinstance(self.renderer, CanvasRenderer):
+            self.animation = GifAnimation(self.renderer.canvas, item, img_data, self.renderer.images)
+            self.animation.start()
         self.pen.goto(pos_desc[0], pos_desc[1])
-        self.text.write(Constants.LIONDANCE_DESC, max_len=500, line_height=35, font=("SimHei", 11, "normal"))
+        _write_text(self.text, desc or self.DESC)
 
 
 class Cantonese:
-    def __init__(self, pen: turtle.Turtle, screen: turtle.Screen()):
+    # 默认的例句和介绍文字，场景文件中的"example"和"desc"覆盖此设置
+    EXAMPLE = {"constant": "CANTONESE_EXAMPLE", "font": ("LiSu", 25, "italic"), "pencolor": "orange"}
+    DESC = {"constant": "CANTONESE_DESC", "font": ("SimHei", 11, "normal"), "max_len": 600}
+
+    def __init__(self, pen: GeometryPen, renderer: Renderer):
         self.pen = pen
-        self.screen = screen
+        self.renderer = renderer
 
-        self.eg = TextDisplayer(self.pen, self.screen)
-        self.desc = TextDisplayer(self.pen, self.screen)
+        self.eg = TextDisplayer(self.pen, self.renderer)
+        self.desc = TextDisplayer(self.pen, self.renderer)
 
     def draw(self, pos_eg: Tuple[Union[int, float], Union[int, float]],
-             pos_desc: Tuple[Union[int, float], Union[int, float]]) -> None:
+             pos_desc: Tuple[Union[int, float], Union[int, float]],
+             example: Optional[dict] = None, desc: Optional[dict] = None) -> None:
         self.pen.goto(pos_eg[0], pos_eg[1])
-        self.eg.write(Constants.CANTONESE_EXAMPLE, font=("LiSu", 25, "italic"), pencolor="orange")
+        _write_text(self.eg, example or self.EXAMPLE)
         self.pen.goto(pos_desc[0], pos_desc[1])
-        self.desc.write(Constants.CANTONESE_DESC, max_len=600, font=("SimHei", 11, "normal"))
+        _write_text(self.desc, desc or self.DESC)
+
+
+class DebugGrid:
+    """
+    调试坐标系图层：坐标系只计算一次，之后可随时显示、隐藏，场景重建后从缓存恢复
+    """
+    LAYER = Layer.BACKGROUND
+    # (轴长, 刻度间隔, 标签偏移) -> 坐标系图元
+    _cache = {}
+
+    def __init__(self, renderer: Renderer, axis_length: int = 800, tick_interval: int = 50,
+                 label_offset: int = 20) -> None:
+        """
+        初始化调试坐标系图层
+        :param renderer: 渲染后端
+        :param axis_length: 坐标轴长
+        :param tick_interval: 刻度间隔
+        :param label_offset: 标签偏移量
+        """
+        self.renderer = renderer
+        self.key = (axis_length, tick_interval, label_offset)
+        self.visible = False
+
+    def primitives(self) -> Tuple[Primitive, ...]:
+        """
+        获取坐标系图元，首次调用时计算
+        :return: 坐标系图元
+        """
+        if self.key not in self._cache:
+            pen = GeometryPen(RecordingRenderer())
+            _draw_coordinate_system(pen, None, *self.key)
+            pen.finish()
+            self._cache[self.key] = tuple(coalesce(pen.renderer.primitives))
+        return self._cache[self.key]
+
+    def show(self) -> None:
+        """
+        显示坐标系，图层不存在（首次显示或画布被清空）时从缓存的图元重新输出到最底层
+        """
+        if not self.renderer.has_layer(self.LAYER):
+            with self.renderer.layer(self.LAYER):
+                self.renderer.draw_all(self.primitives())
+            self.renderer.lower_layer(self.LAYER)
+        self.renderer.set_layer_visible(self.LAYER, True)
+        self.visible = True
+
+    def hide(self) -> None:
+        """
+        隐藏坐标系，画布对象保留
+        """
+        if self.renderer.has_layer(self.LAYER):
+            self.renderer.set_layer_visible(self.LAYER, False)
+        self.visible = False
+
+    def toggle(self) -> None:
+        """
+        切换坐标系的显示状态
+        """
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+        self.renderer.update()
+
+
+class Scene:
+    """
+    声明式场景：从JSON文件读取骑楼规模和各组件的位置、字体、文本，
+    编译为按图层分组的图元，编译结果按场景内容和渲染设置缓存到磁盘
+    """
+    # 编译结果格式的版本，格式或绘制代码变化时递增以作废旧缓存
+    VERSION = 1
+
+    def __init__(self, path: str) -> None:
+        """
+        读取场景文件
+        :param path: 场景文件路径
+        """
+        self.path = path
+        with open(path, encoding="utf-8") as f:
+            self.spec = json.load(f)
+
+    @property
+    def origin(self) -> Point:
+        return tuple(self.spec["qilou"]["origin"])
+
+    @property
+    def column(self) -> int:
+        return self.spec["qilou"]["column"]
+
+    @property
+    def floor(self) -> int:
+        return self.spec["qilou"]["floor"]
+
+    @staticmethod
+    def text_of(component: dict) -> str:
+        """
+        获取组件的文本，"constant"引用Constants中的常量，否则取"text"
+        :param component: 组件描述
+        :return: 文本
+        """
+        if "constant" in component:
+            return getattr(Constants, component["constant"])
+        return component["text"]
+
+    def cache_key(self, renderer: Renderer) -> str:
+        """
+        计算编译结果的缓存键，包含解析常量后的场景内容、资源和影响排版与细分的渲染设置
+        :param renderer: 渲染后端
+        :return: 缓存键
+        """
+        def resolve(value: object) -> object:
+            # 组件及其中嵌套的文本描述都可能引用常量，常量内容变化时缓存键随之变化
+            if isinstance(value, dict):
+                value = {key: resolve(item) for key, item in value.items()}
+                if "constant" in value:
+                    value["text"] = self.text_of(value)
+            elif isinstance(value, list):
+                value = [resolve(item) for item in value]
+            return value
+
+        resolved = resolve(self.spec["components"])
+        settings = [type(renderer).__name__, renderer.scaling, renderer.pixel_size, TESSELLATION_TOLERANCE]
+        payload = json.dumps([self.VERSION, self.spec["qilou"], resolved, ASSETS.index, settings],
+                             ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def compile(self, renderer: Renderer, building: bool = True) -> List[Tuple[Optional[str], Primitive]]:
+        """
+        执行排版和几何计算，得到可直接输出的图元
+        :param renderer: 目标渲染后端，文本按它测量
+        :param building: 是否包含骑楼
+        :return: (图层名, 图元)列表
+        """
+        recorder = RecordingRenderer(target=renderer)
+        pen = GeometryPen(recorder)
+        draw_scene(pen, recorder, building, self)
+        pen.finish()
+        return [(recorder.layer_of(item), prim) for item, prim in recorder.items()]
+
+    @staticmethod
+    def _dump(prim: Primitive) -> dict:
+        if isinstance(prim, Polyline):
+            return {"type": "polyline", "points": prim.points, "color": prim.color, "width": prim.width}
+        if isinstance(prim, Polygon):
+            return {"type": "polygon", "points": prim.points, "fillcolor": prim.fillcolor}
+        if isinstance(prim, TextItem):
+            return {"type": "text", "pos": prim.pos, "text": prim.text, "font": prim.font, "align": prim.align,
+                    "color": prim.color}
+        return {"type": "image", "pos": prim.pos, "data": base64.b64encode(prim.data).decode("ascii")}
+
+    @staticmethod
+    def _load(obj: dict) -> Primitive:
+        def color(value: Union[str, list]) -> Color:
+            return value if isinstance(value, str) else tuple(value)
+
+        def points(value: list) -> Tuple[Point, ...]:
+            return tuple((x, y) for x, y in value)
+
+        if obj["type"] == "polyline":
+            return Polyline(points(obj["points"]), color(obj["color"]), obj["width"])
+        if obj["type"] == "polygon":
+            return Polygon(points(obj["points"]), color(obj["fillcolor"]))
+        if obj["type"] == "text":
+            return TextItem(tuple(obj["pos"]), obj["text"], tuple(obj["font"]), obj["align"], color(obj["color"]))
+        return ImageItem(tuple(obj["pos"]), base64.b64decode(obj["data"]))
+
+    def load(self, renderer: Renderer, cache_dir: Optional[str] = None,
+             building: bool = True) -> List[Tuple[Optional[str], Primitive]]:
+        """
+        获取编译结果，缓存命中时直接读取，否则编译并写入缓存
+        :param renderer: 目标渲染后端
+        :param cache_dir: 缓存目录，为None时不缓存
+        :param building: 是否包含骑楼
+        :return: (图层名, 图元)列表
+        """
+        if cache_dir is None:
+            return self.compile(renderer, building)
+        path = os.path.join(cache_dir, f"scene_{self.cache_key(renderer)}{'' if building else '_static'}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                return [(layer, self._load(obj)) for layer, obj in json.load(f)]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        compiled = self.compile(renderer, building)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump([(layer, self._dump(prim)) for layer, prim in compiled], f, ensure_ascii=False)
+        except OSError:
+            pass
+        return compiled
+
+    def draw(self, renderer: Renderer, cache_dir: Optional[str] = None, building: bool = True) -> List["GifAnimation"]:
+        """
+        输出场景，画布后端上的多帧GIF开始播放
+        :param renderer: 渲染后端
+        :param cache_dir: 编译结果的缓存目录
+        :param building: 是否包含骑楼
+        :return: 正在播放的GIF动画
+        """
+        animations = []
+        for layer, prim in self.load(renderer, cache_dir, building):
+            with renderer.layer(layer):
+                item = renderer.draw(prim)
+            if isinstance(prim, ImageItem) and isinstance(renderer, CanvasRenderer):
+                animation = GifAnimation(renderer.canvas, item, prim.data, renderer.images)
+                animation.start()
+                animations.append(animation)
+        renderer.update()
+        return animations
+
+
+class SceneRaster:
+    """
+    默认场景的位图缓存：首次完整绘制后截取画布保存为PPM，之后启动时先显示位图，
+    实时场景在位图下方绘制完成后再移除位图。缓存按场景内容、可见区域和画布大小区分，只保留最新的一个
+    """
+    TAG = "scene-raster"
+    # 等待实时场景绘制完成的轮询间隔，单位为毫秒
+    POLL_INTERVAL = 50
+    # 缓存文件名的前缀和后缀，写入新缓存时删除其余同类文件
+    PREFIX, SUFFIX = "scene_", ".ppm"
+
+    def __init__(self, canvas: tkinter.Canvas, key: str, cache_dir: str) -> None:
+        """
+        初始化位图缓存，应在窗口几何和画布滚动范围确定之后创建，此时的可见区域即默认视图
+        :param canvas: 画布，turtle的ScrolledCanvas时截取其中的Tk画布
+        :param key: 场景内容的缓存键，如Scene.cache_key
+        :param cache_dir: 缓存目录
+        """
+        self.canvas = getattr(canvas, "_canvas", canvas)
+        self.key = key
+        self.cache_dir = cache_dir
+        self.view = self._view()
+        self.image = None
+
+    def _view(self) -> Tuple[int, int, int, int]:
+        """
+        当前可见区域
+        :return: (左上角画布x坐标, 左上角画布y坐标, 宽, 高)
+        """
+        canvas = self.canvas
+        canvas.update_idletasks()
+        return (round(canvas.canvasx(0)), round(canvas.canvasy(0)),
+                canvas.winfo_width(), canvas.winfo_height())
+
+    def _path(self, view: Tuple[int, int, int, int]) -> str:
+        scaling = self.canvas.tk.call("tk", "scaling")
+        payload = json.dumps([self.key, view, scaling])
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{self.PREFIX}{digest}{self.SUFFIX}")
+
+    def show(self) -> bool:
+        """
+        显示与默认视图相符的缓存位图并立即刷新一帧
+        :return: 是否有可用的缓存
+        """
+        path = self._path(self.view)
+        if not os.path.exists(path):
+            return False
+        try:
+            image = tkinter.PhotoImage(master=self.canvas, file=path)
+        except TclError:
+            os.remove(path)
+            return False
+        if (image.width(), image.height()) != self.view[2:]:
+            return False
+        self.image = image
+        self.canvas.create_image(*self.view[:2], image=image, anchor=tkinter.NW, tags=self.TAG)
+        self.canvas.update()
+        return True
+
+    def raise_(self) -> None:
+        """
+        将位图置于最上层，遮住其下正在绘制的实时场景
+        """
+        self.canvas.tag_raise(self.TAG)
+
+    def settle(self, busy: Callable[[], bool], complete: Callable[[], bool] = lambda: True) -> None:
+        """
+        等待实时场景绘制完成，之后移除位图；没有缓存时截取画布保存
+        :param busy: 实时场景是否仍在绘制
+        :param complete: 画布是否仍为默认场景，用户已修改场景时不保存
+        """
+        if busy():
+            self.canvas.after(self.POLL_INTERVAL, self.settle, busy, complete)
+            return
+        if self.image is not None:
+            self.canvas.delete(self.TAG)
+            self.image = None
+        elif complete():
+            self.canvas.update()
+            self.save()
+
+    def save(self) -> bool:
+        """
+        截取画布当前内容保存为PPM，并删除旧的缓存。可见区域已偏离默认视图（如用户拖动过画布）时不保存
+        :return: 是否保存成功，不支持截取的平台上为False
+        """
+        view = self._view()
+        if view != self.view:
+            return False
+        captured = _capture_window(self.canvas)
+        if captured is None:
+            return False
+        width, height, pixels = captured
+        if (width, height) != view[2:]:
+            return False
+        path = self._path(view)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(b"P6\n%d %d\n255\n" % (width, height))
+                f.write(pixels)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            return False
+        for name in os.listdir(self.cache_dir):
+            stale = os.path.join(self.cache_dir, name)
+            if name.startswith(self.PREFIX) and name.endswith(self.SUFFIX) and stale != path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+        return True
+
+
+def _draw_component(pen: GeometryPen, renderer: Renderer, component: dict) -> None:
+    """
+    按组件描述绘制场景中的一个组件
+    :param pen: 几何画笔对象
+    :param renderer: 渲染后端
+    :param component: 组件描述
+    """
+    kind = component["type"]
+    if kind == "text":
+        pen.goto(*component["pos"])
+        _write_text(TextDisplayer(pen, renderer), component)
+    elif kind == "write":
+        pen.goto(*component["pos"])
+        pen.pencolor(component.get("color", "black"))
+        pen.write(Scene.text_of(component), component.get("move", False), component.get("align", "left"),
+                  tuple(component["font"]))
+    elif kind == "image":
+        ImageDisplayer(renderer).show_img(*component["pos"], ASSETS.get(component["asset"]))
+    elif kind == "liondance":
+        LionDance(pen, renderer).draw(tuple(component["pos_img"]), tuple(component["pos_desc"]),
+                                      component.get("desc"), component.get("asset", "liondance"))
+    elif kind == "cantonese":
+        Cantonese(pen, renderer).draw(tuple(component["pos_eg"]), tuple(component["pos_desc"]),
+                                      component.get("example"), component.get("desc"))
+    else:
+        raise ValueError(f"unexpected component type {kind!r}")
+
+
+def draw_scene(pen: GeometryPen, renderer: Renderer, building: bool = True, scene: Optional[Scene] = None) -> None:
+    """
+    按场景描述直接绘制初始场景：骑楼、骑楼介绍、舞狮、粤语和提示，各部分分别归入对应的图层
+    :param pen: 几何画笔对象
+    :param renderer: 渲染后端
+    :param building: 是否绘制骑楼，由QilouView绘制骑楼时为False
+    :param scene: 场景描述，默认读取SCENE_FILE
+    """
+    if scene is None:
+        scene = Scene(SCENE_FILE)
+    pen.penup()
+    if building:
+        with renderer.layer(Layer.BUILDING):
+            pen.goto(scene.origin)
+            qilou = Qilou(pen)
+            qilou.draw(scene.column, scene.floor)
+
+    for component in scene.spec["components"]:
+        with renderer.layer(component["layer"]):
+            _draw_component(pen, renderer, component)
+
+
+class Profiler:
+    """
+    性能埋点：按组件统计操作次数，记录各绘制阶段的耗时，导出为Chrome trace（Perfetto可读）的JSON
+    启用时才替换被测函数，未启用时没有任何额外开销
+    """
+
+    def __init__(self) -> None:
+        """
+        初始化性能埋点，默认未启用
+        """
+        self.enabled = False
+        self.counts = {}
+        self.events = []
+        self._patched = []
+        self._origin = perf_counter()
+
+    @staticmethod
+    def _hooks() -> Tuple[list, list]:
+        """
+        被测函数列表
+        :return: (计数列表[(组件, 操作, 所属对象, 属性名)], 计时列表[(阶段名, 所属对象, 属性名)])
+        """
+        module = sys.modules[__name__]
+        counters = [("pen", name, GeometryPen, name)
+                    for name in ("goto", "forward", "circle", "trace", "write", "begin_fill", "end_fill")]
+        counters += [("turtle", name, turtle.RawTurtle, name)
+                     for name in ("goto", "forward", "circle", "write", "begin_fill", "end_fill", "undo")]
+        counters += [
+            ("canvas", lambda args: f"create_{args[1]}", tkinter.Canvas, "_create"),
+            ("canvas", "delete", tkinter.Canvas, "delete"),
+            ("tk", "update", tkinter.Misc, "update"),
+            ("tk", "update_idletasks", tkinter.Misc, "update_idletasks"),
+            ("tk", "font.measure", tkinter.font.Font, "measure"),
+            ("text", "char_width", FontMetrics, "char_width"),
+            ("text", "layout", TextLayout, "lines"),
+            ("shape", "half_ellipse", BasicShape, "half_ellipse"),
+        ]
+        spans = [
+            ("_draw_coordinate_system", module, "_draw_coordinate_system"),
+            ("scene", module, "draw_scene"),
+            ("Qilou.draw", Qilou, "draw"),
+            ("TextDisplayer.write", TextDisplayer, "write"),
+            ("LionDance.draw", LionDance, "draw"),
+            ("Cantonese.draw", Cantonese, "draw"),
+            ("QilouView.show", QilouView, "show"),
+            ("QilouView.refresh", QilouView, "refresh"),
+            ("QilouView.draw_chunk", QilouView, "_draw_chunk"),
+            ("ViewNavigator.zoom", ViewNavigator, "zoom_at"),
+        ]
+        return counters, spans
+
+    def _patch(self, owner: object, name: str, wrap: Callable[[Callable], Callable]) -> None:
+        """
+        替换函数并记录原函数以便恢复
+        :param owner: 函数所属的类或模块
+        :param name: 属性名
+        :param wrap: 由原函数生成替换函数
+        """
+        original = getattr(owner, name)
+        own = name in vars(owner)
+        self._patched.append((owner, name, vars(owner)[name] if own else None))
+        setattr(owner, name, functools.wraps(original)(wrap(original)))
+
+    def enable(self) -> None:
+        """
+        启用埋点
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        counters, spans = self._hooks()
+        for component, op, owner, name in counters:
+            self._patch(owner, name, lambda func, component=component, op=op: self._counting(component, op, func))
+        for span, owner, name in spans:
+            self._patch(owner, name, lambda func, span=span: self._timing(span, func))
+
+    def disable(self) -> None:
+        """
+        停用埋点并恢复被替换的函数，已收集的数据保留
+        """
+        for owner, name, original in reversed(self._patched):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self._patched.clear()
+        self.enabled = False
+
+    def _counting(self, component: str, op: Union[str, Callable[[tuple], str]], func: Callable) -> Callable:
+        counts = self.counts
+
+        def wrapper(*args, **kwargs):
+            key = (component, op if isinstance(op, str) else op(args))
+            counts[key] = counts.get(key, 0) + 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    def _timing(self, span: str, func: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(span, start, perf_counter())
+        return wrapper
+
+    def record(self, span: str, start: float, end: float) -> None:
+        """
+        记录一个阶段
+        :param span: 阶段名
+        :param start: 开始时刻，perf_counter的返回值
+        :param end: 结束时刻
+        """
+        self.events.append({"name": span, "cat": "scene", "ph": "X", "pid": os.getpid(),
+                            "tid": threading.get_ident(), "ts": (start - self._origin) * 1e6,
+                            "dur": (end - start) * 1e6})
+
+    def summary(self) -> str:
+        """
+        汇总各阶段耗时和各组件操作次数
+        :return: 可读的汇总文本
+        """
+        totals = {}
+        for event in self.events:
+            count, total = totals.get(event["name"], (0, 0.0))
+            totals[event["name"]] = (count + 1, total + event["dur"] / 1e3)
+        lines = [f"{name}: {count}次 共{total:.1f}ms" for name, (count, total) in totals.items()]
+        lines += [f"{component}.{op}: {count}" for (component, op), count in sorted(self.counts.items())]
+        return "\n".join(lines)
+
+    def export(self, path: str) -> None:
+        """
+        导出为Chrome trace格式的JSON，可用chrome://tracing或Perfetto打开
+        :param path: 文件路径
+        """
+        now = (perf_counter() - self._origin) * 1e6
+        components = {}
+        for (component, op), count in self.counts.items():
+            components.setdefault(component, {})[op] = count
+        counters = [{"name": component, "cat": "ops", "ph": "C", "pid": os.getpid(), "ts": now, "args": args}
+                    for component, args in components.items()]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events + counters, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+
+PROFILER = Profiler()
 
 
 # 缩放因子
 ZOOM_FACTOR = 2
-# 基准点
-BENCHMARK = (-800, -300)
 # 调试模式
 DEBUG = True
+# 渲染后端，"turtle"为逐步动画绘制，"canvas"为直接创建画布对象
+RENDERER = "canvas"
+# 曲线细分允许的最大弦高误差，单位为屏幕像素
+TESSELLATION_TOLERANCE = 0.5
+# 场景描述文件
+SCENE_FILE = os.path.join(ASSETS.directory, "scene.json")
+# 缓存目录
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".lingnan_culture")
+# 是否启用性能埋点，初始骑楼绘制完成后打印耗时汇总；关闭且TRACE_FILE为None时不替换任何函数，没有额外开销
+PROFILE = False
+# 性能追踪文件，程序退出时导出Chrome trace，设置后同时启用埋点
+TRACE_FILE = None
 
 
 def main():
     """
     主函数，程序入口
     """
+    if PROFILE or TRACE_FILE:
+        PROFILER.enable()
     screen = turtle.Screen()
     screen.title("岭南印记：骑楼・醒狮・粤韵")
     screen.bgcolor("white")
@@ -831,18 +3535,19 @@ def main():
 
     root = screen.getcanvas().winfo_toplevel()
     root.tk.call("tk", "scaling", _get_windows_scaling() * ZOOM_FACTOR)
-    root.state("zoomed")
+    _maximize(root)
 
-    pen = turtle.Turtle()
-    pen.speed(10)
-    if DEBUG: _draw_coordinate_system(pen, screen, axis_length=800)
-
-    def _debug_get_point(*args):
-        """
-        调试函数，打印点击位置
-        :param args: 点击位置的坐标
-        """
-        print(f"clicked at {args}")
+    if RENDERER == "turtle":
+        turtle_pen = turtle.Turtle()
+        turtle_pen.speed(10)
+        renderer = TurtleRenderer(turtle_pen)
+    else:
+        renderer = CanvasRenderer.for_screen(screen)
+    metrics = FontMetrics.for_renderer(renderer, cache_dir=CACHE_DIR)
+    pen = GeometryPen(renderer)
+    grid = DebugGrid(renderer, axis_length=800)
+    if DEBUG:
+        grid.show()
 
     def diy_qilou(x, y):
         """
@@ -850,7 +3555,8 @@ def main():
         :param x: 点击位置的x坐标
         :param y: 点击位置的y坐标
         """
-        if -840 <= x <= -250 and -310 <= y <= 150:
+        hit = qilou_view.hit_test(x, y)
+        if hit is not None:
             while True:
                 column_input = screen.textinput("列", "输入骑楼的列数")
                 if column_input is None:
@@ -874,54 +3580,130 @@ def main():
                 except ValueError:
                     mb.showerror("错误", "无效的正整数，且必须大于 1 !")
 
-            screen.clear()
-            pen.showturtle()
-            pen.goto(BENCHMARK)
-            if DEBUG:
-                screen.tracer(0, 0)
-            else:
-                screen.tracer(2, 0)
-            qilou.draw(column, floor)
-
-    if DEBUG:
-        start = perf_counter()
-
-    pen.penup()
-    pen.goto(BENCHMARK)
-    qilou_start = perf_counter()
-    qilou = Qilou(pen)
-    qilou.draw()
-    qilou_end = perf_counter()
-    print(f"骑楼绘制用时{round(qilou_end - qilou_start, 2)}s")
-
-    pen.goto(-800, 400)
-    qilou_td = TextDisplayer(pen, screen)
-    qilou_td.write(Constants.QILOU_DESC, max_len=500, line_height=40, font=("SimHei", 11, "normal"))
-
-    liondance = LionDance(pen, screen)
-    liondance.draw((200, 230), (300, 300))
+            qilou_view.show(column, floor)
 
-    cantonese = Cantonese(pen, screen)
-    cantonese.draw((-50, -150), (-50, -200))
-
-    pen.goto(0, -450)
-    pen.pencolor("gray")
-    pen.write(Constants.QILOU_NOTICE, True, "center", ("SimHei", 12, "normal"))
+    # 先应用最大化后的窗口几何并确定骑楼的滚动范围，此时的可见区域即默认视图；骑楼在空闲时才开始绘制
+    screen.update()
+    scene = Scene(SCENE_FILE)
+    qilou_view = QilouView(screen, scene.origin, renderer=renderer)
+    qilou_view.show(scene.column, scene.floor)
+
+    # 有缓存位图时先显示，实时场景在其下方绘制
+    raster = SceneRaster(renderer.canvas, f"{scene.cache_key(renderer)}-{RENDERER}-{DEBUG}", CACHE_DIR)
+    restored = raster.show()
+    if restored:
+        screen.tracer(0, 0)
+
+    # 骑楼由QilouView经同一后端分帧绘制并建立点击索引；turtle后端保留逐步绘制的动画，画布后端直接输出编译好的图元
+    if isinstance(renderer, TurtleRenderer):
+        draw_scene(pen, renderer, building=False, scene=scene)
+    else:
+        scene.draw(renderer, cache_dir=CACHE_DIR, building=False)
+    metrics.save()
 
     pen.home()
     pen.hideturtle()
     if DEBUG:
-        end = perf_counter()
-        period = end - start
-        print(f"主体绘制总耗时{round(period, 2)}s")
-        screen.onclick(_debug_get_point)
+        screen.onkey(grid.toggle, "F12")
+    navigator = ViewNavigator(screen, qilou_view)
+    if restored:
+        raster.raise_()
+        screen.tracer(1, 0)
+    raster.settle(lambda: qilou_view.busy,
+                  lambda: (qilou_view.column, qilou_view.floor, navigator.zoom) == (scene.column, scene.floor, 1.0))
+
+    def print_summary():
+        """
+        骑楼分帧绘制完成后打印耗时汇总，使汇总包含骑楼的计算和绘制
+        """
+        if qilou_view.busy:
+            screen.ontimer(print_summary, SceneRaster.POLL_INTERVAL)
+        else:
+            print(PROFILER.summary())
+
+    if PROFILE:
+        print_summary()
     screen.onclick(diy_qilou)
     screen.listen()
     screen.update()
-    screen.mainloop()
+    try:
+        screen.mainloop()
+    finally:
+        if TRACE_FILE:
+            PROFILER.export(TRACE_FILE)
+
+
+def _parse_sizes(text: str, minimum: int = 1) -> List[int]:
+    """
+    解析尺寸列表，支持"3,5,8"和"2-10"两种写法及其组合
+    :param text: 尺寸字符串
+    :param minimum: 允许的最小尺寸
+    :return: 去重排序后的尺寸
+    :raise argparse.ArgumentTypeError: 格式错误、范围为空或反向、尺寸小于最小值
+    """
+    sizes = set()
+    for part in text.split(","):
+        start, _, end = part.strip().partition("-")
+        try:
+            first, last = int(start), int(end or start)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"无效的尺寸 {part.strip()!r}，应为正整数或\"起-止\"范围") from None
+        if first > last:
+            raise argparse.ArgumentTypeError(f"范围 {part.strip()!r} 的起点大于终点")
+        if first < minimum:
+            raise argparse.ArgumentTypeError(f"尺寸 {part.strip()!r} 必须不小于 {minimum}")
+        sizes.update(range(first, last + 1))
+    return sorted(sizes)
+
+
+def _export_qilou(job: Tuple[int, int, str]) -> Tuple[str, int]:
+    """
+    在子进程中绘制一个规模的骑楼并保存为SVG
+    :param job: (列数, 层数, 文件路径)
+    :return: (文件路径, 图元数量)
+    """
+    column, floor, path = job
+    renderer = SvgRenderer()
+    pen = GeometryPen(renderer, (0, 0))
+    pen.penup()
+    Qilou(pen).draw(column, floor)
+    pen.finish()
+    renderer.save(path)
+    return path, len(renderer.primitives)
+
+
+def export(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行批量导出：无窗口绘制多种规模的骑楼，用进程池并行写出SVG文件
+    :param argv: 命令行参数
+    :return: 退出码
+    """
+    parser = argparse.ArgumentParser(prog="main.py export", description="批量导出骑楼SVG")
+    parser.add_argument("--columns", type=_parse_sizes, default="3", help="列数，如 3,5 或 2-10")
+    # 与交互式修改骑楼相同，层数至少为2
+    parser.add_argument("--floors", type=lambda text: _parse_sizes(text, minimum=2), default="2",
+                        help="层数，不小于2，如 2,4 或 2-6")
+    parser.add_argument("--out", default="export", help="输出目录")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认为CPU核数")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out, exist_ok=True)
+    jobs = [(column, floor, os.path.join(args.out, f"qilou_{column}x{floor}.svg"))
+            for column in args.columns for floor in args.floors]
+    workers = args.workers or os.cpu_count() or 1
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for path, count in executor.map(_export_qilou, jobs, chunksize=max(1, len(jobs) // (workers * 4))):
+            print(f"{path}: {count}个图元")
+    print(f"导出{len(jobs)}个文件，用时{perf_counter() - start:.2f}s")
+    return 0
 
 
 if __name__ == "__main__":
+    # 打包为exe后，进程池的子进程需要由此接管
+    multiprocessing.freeze_support()
+    if sys.argv[1:2] == ["export"]:
+        sys.exit(export(sys.argv[2:]))
     try:
         main()
     except (turtle.Terminator, KeyboardInterrupt, TclError):